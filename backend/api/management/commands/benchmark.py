@@ -0,0 +1,286 @@
+import base64
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from foodgram.metrics import percentile
+from recipes.importers import import_file
+from recipes.models import Ingredient, Tag
+from recipes.synthetic import Dataset, placeholder_image, seed
+from users.models import User
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк основных эндпоинтов API. Создаёт временную тестовую '
+        'базу с синтетическими данными, замеряет задержку, пропускную '
+        'способность и число SQL-запросов и пишет результаты в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Замеров на сценарий.',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Прогревочных запросов на сценарий, не учитываются.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--ingredients',
+            default=str(settings.BASE_DIR.parent / 'data' / 'ingredients.csv'),
+            help='Файл ингредиентов CSV или JSON.',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='Куда записать результаты.',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Прошлые результаты JSON для сравнения медиан.',
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Не удалять тестовую базу после замеров.',
+        )
+
+    def handle(self, *args, **options):
+        dataset = Dataset(users=options['users'], recipes=options['recipes'])
+        media_root = tempfile.mkdtemp(prefix='benchmark-media-')
+        database_name = connection.settings_dict['NAME']
+        setup_test_environment()
+        try:
+            with override_settings(MEDIA_ROOT=media_root, CACHES=CACHES):
+                connection.creation.create_test_db(
+                    verbosity=0, autoclobber=True, keepdb=options['keepdb']
+                )
+                try:
+                    results = self.run_benchmark(dataset, options)
+                finally:
+                    connection.creation.destroy_test_db(
+                        database_name, verbosity=0, keepdb=options['keepdb']
+                    )
+        finally:
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        self.report(results, options['compare'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Результаты записаны в {options["output"]}')
+        )
+
+    def run_benchmark(self, dataset, options):
+        started = time.perf_counter()
+        if not Ingredient.objects.exists():
+            import_file(options['ingredients'])
+        user_ids, recipe_ids = seed(dataset, seed=options['seed'])
+        seeded = time.perf_counter() - started
+        self.stdout.write(f'Данные созданы за {seeded:.1f} с')
+        rng = random.Random(options['seed'])
+        user = User.objects.get(pk=user_ids[0])
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+        )
+        anonymous = APIClient()
+        results = {}
+        for name, request in self.get_scenarios(
+            rng, client, anonymous, recipe_ids
+        ):
+            results[name] = self.measure(
+                name, request, options['iterations'], options['warmup']
+            )
+        return {
+            'meta': {
+                'commit': self.get_commit(),
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'dataset': dataset.as_dict(),
+                'seed': options['seed'],
+                'seed_seconds': round(seeded, 2),
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+            },
+            'results': results,
+        }
+
+    @staticmethod
+    def get_scenarios(rng, client, anonymous, recipe_ids):
+        """Пары (имя, функция запроса по номеру итерации)."""
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        prefixes = sorted(
+            {
+                name[:3]
+                for name in Ingredient.objects.values_list('name', flat=True)
+            }
+        )
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        image = (
+            'data:image/png;base64,'
+            + base64.b64encode(placeholder_image(rng, (320, 240))).decode()
+        )
+
+        def create_recipe(index):
+            return client.post(
+                '/api/recipes/',
+                {
+                    'name': f'Бенчмарк {index}',
+                    'text': 'Рецепт из бенчмарка',
+                    'cooking_time': 30,
+                    'image': image,
+                    'tags': rng.sample(tag_ids, 1),
+                    'ingredients': [
+                        {'id': ingredient_id, 'amount': rng.randint(1, 100)}
+                        for ingredient_id in rng.sample(ingredient_ids, 5)
+                    ],
+                },
+                format='json',
+            )
+
+        return (
+            (
+                'recipe_list',
+                lambda index: client.get(
+                    f'/api/recipes/?page={index % 5 + 1}'
+                ),
+            ),
+            (
+                'recipe_list_anonymous',
+                lambda index: anonymous.get(
+                    f'/api/recipes/?page={index % 5 + 1}'
+                ),
+            ),
+            (
+                'recipe_retrieve',
+                lambda index: client.get(
+                    f'/api/recipes/{rng.choice(recipe_ids)}/'
+                ),
+            ),
+            ('recipe_create', create_recipe),
+            (
+                'ingredient_search',
+                lambda index: anonymous.get(
+                    '/api/ingredients/',
+                    {'name': prefixes[index % len(prefixes)]},
+                ),
+            ),
+            (
+                'subscriptions',
+                lambda index: client.get(
+                    '/api/users/subscriptions/?recipes_limit=3'
+                ),
+            ),
+            (
+                'shopping_cart_download',
+                lambda index: client.get(
+                    '/api/recipes/download_shopping_cart/'
+                ),
+            ),
+        )
+
+    def measure(self, name, request, iterations, warmup):
+        for index in range(warmup):
+            self.consume(name, request(index))
+        timings = []
+        queries = []
+        started = time.perf_counter()
+        for index in range(iterations):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                self.consume(name, request(warmup + index))
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(len(context.captured_queries))
+        elapsed = time.perf_counter() - started
+        return {
+            'median_ms': round(statistics.median(timings), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+            'min_ms': round(min(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'throughput_rps': round(iterations / elapsed, 1),
+            'queries_median': statistics.median(queries),
+            'queries_max': max(queries),
+        }
+
+    @staticmethod
+    def consume(name, response):
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{name}: ответ {response.status_code} {response.content!r}'
+            )
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    @staticmethod
+    def get_commit():
+        try:
+            return subprocess.run(
+                ('git', 'rev-parse', '--short', 'HEAD'),
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def report(self, results, compare):
+        previous = {}
+        if compare:
+            with open(compare, encoding='utf-8') as file:
+                previous = json.load(file)['results']
+        self.stdout.write(
+            f'{"сценарий":24} {"медиана":>9} {"p95":>9} '
+            f'{"запр/с":>8} {"SQL":>5}'
+        )
+        for name, result in results['results'].items():
+            line = (
+                f'{name:24} {result["median_ms"]:9.2f} '
+                f'{result["p95_ms"]:9.2f} {result["throughput_rps"]:8.1f} '
+                f'{result["queries_median"]:5}'
+            )
+            if name in previous:
+                before = previous[name]['median_ms']
+                change = (result['median_ms'] - before) / before * 100
+                line += f'  было {before:.2f} мс ({change:+.1f}%)'
+            self.stdout.write(line)
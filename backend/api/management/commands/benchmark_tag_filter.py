@@ -0,0 +1,53 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from api.v1.filters import RecipeFilter, get_tag_ids
+from foodgram.metrics import percentile
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет фильтр рецептов по тегам: время первой страницы '
+        'и подсчёта при растущем числе тегов в запросе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз повторять каждый замер.',
+        )
+        parser.add_argument(
+            '--limit', type=int, default=6, help='Размер страницы.'
+        )
+
+    def measure(self, slugs, repeat, limit):
+        data = QueryDict(mutable=True)
+        data.setlist('tags', slugs)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = RecipeFilter(data, queryset=Recipe.objects.all()).qs
+            queryset.count()
+            list(queryset[:limit])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def handle(self, *args, **options):
+        slugs = sorted(get_tag_ids())
+        if not slugs:
+            raise CommandError('Нет тегов для замера.')
+        self.stdout.write('тегов  медиана, мс  p95, мс')
+        for count in range(1, len(slugs) + 1):
+            timings = self.measure(
+                slugs[:count], options['repeat'], options['limit']
+            )
+            self.stdout.write(
+                f'{count:5}  {statistics.median(timings):11.2f}  '
+                f'{percentile(timings, 0.95):7.2f}'
+            )
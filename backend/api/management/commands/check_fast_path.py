@@ -0,0 +1,120 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from api.v1.renderers import FastJSONRenderer, orjson
+from api.v1.serializers import RecipeListSerializer
+from recipes.models import Recipe
+from recipes.synthetic import batches
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет карточки рецептов из .values() и orjson с сериализатором '
+        'и JSONRenderer байт в байт и замеряет процессорное время обоих.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=1000,
+            help='Сколько рецептов проверить, 0 - все.',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=6,
+            help='Рецептов на странице при замере.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Сколько раз повторять замер.',
+        )
+
+    @staticmethod
+    def get_host():
+        """Хост из ALLOWED_HOSTS для абсолютных ссылок на изображения.
+
+        RequestFactory по умолчанию шлёт testserver, которого вне тестов
+        нет в ALLOWED_HOSTS: ссылки падали бы с DisallowedHost.
+        """
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*':
+                return host.lstrip('.')
+        return 'localhost'
+
+    def get_serializer(self):
+        request = RequestFactory(SERVER_NAME=self.get_host()).get(
+            '/api/recipes/'
+        )
+        request.user = AnonymousUser()
+        return RecipeListSerializer(context={'request': request})
+
+    @staticmethod
+    def serializer_path(serializer, recipe_ids):
+        recipes = serializer.load_recipes(recipe_ids)
+        return {
+            recipe_id: JSONRenderer().render(serializer.to_body(recipe))
+            for recipe_id, recipe in recipes.items()
+        }
+
+    @staticmethod
+    def fast_path(serializer, recipe_ids):
+        return {
+            recipe_id: FastJSONRenderer().render(body)
+            for recipe_id, body in serializer.build_bodies(recipe_ids).items()
+        }
+
+    def measure(self, path, serializer, pages, repeat):
+        start = time.process_time()
+        for _ in range(repeat):
+            for page in pages:
+                path(serializer, page)
+        return (time.process_time() - start) * 1000 / repeat / len(pages)
+
+    def handle(self, *args, **options):
+        recipe_ids = Recipe.objects.order_by('id').values_list('id', flat=True)
+        if options['limit']:
+            recipe_ids = recipe_ids[: options['limit']]
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            raise CommandError('Нет рецептов для проверки.')
+        serializer = self.get_serializer()
+        expected = self.serializer_path(serializer, recipe_ids)
+        actual = self.fast_path(serializer, recipe_ids)
+        mismatches = [
+            recipe_id
+            for recipe_id in recipe_ids
+            if expected.get(recipe_id) != actual.get(recipe_id)
+        ]
+        if mismatches:
+            raise CommandError(
+                'Карточки расходятся с сериализатором: '
+                + ', '.join(map(str, mismatches))
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Карточки совпадают байт в байт: {len(recipe_ids)}'
+            )
+        )
+        size = options['page_size']
+        pages = list(batches(recipe_ids, size))
+        reference = self.measure(
+            self.serializer_path, serializer, pages, options['repeat']
+        )
+        fast = self.measure(
+            self.fast_path, serializer, pages, options['repeat']
+        )
+        self.stdout.write(
+            f'Процессорное время на страницу из {size}: сериализатор '
+            f'{reference:.2f} мс, быстрый путь {fast:.2f} мс '
+            f'({reference / fast:.1f}x, orjson: '
+            f'{"да" if orjson else "нет"})'
+        )
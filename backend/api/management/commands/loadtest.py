@@ -0,0 +1,201 @@
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.client import HTTPConnection, HTTPException
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.metrics import percentile
+
+SERVER_MODES = ('gthread', 'uvicorn')
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест API по HTTP с постоянными соединениями. '
+        'С --mode запускает gunicorn в каждом режиме SERVER_MODE '
+        'и сравнивает пропускную способность, иначе нагружает --url.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--mode',
+            action='append',
+            choices=SERVER_MODES,
+            dest='modes',
+            help='Режим сервера для запуска и замера; можно несколько.',
+        )
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Уже запущенный сервер, если режимы не заданы.',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Порт для запускаемых серверов.',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Путь запроса, по кругу; по умолчанию список рецептов.',
+        )
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument(
+            '--duration', type=float, default=10, help='Секунд на замер.'
+        )
+        parser.add_argument(
+            '--warmup', type=float, default=2, help='Секунд прогрева.'
+        )
+        parser.add_argument('--token', help='Токен для авторизации.')
+        parser.add_argument('--output', help='Куда записать результаты.')
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or ['/api/recipes/']
+        headers = {'Accept': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f'Token {options["token"]}'
+        results = {}
+        for mode in options['modes'] or [None]:
+            with self.server(mode, options['url'], options['port']) as url:
+                self.load(url, paths, headers, options, options['warmup'])
+                results[mode or url] = self.load(
+                    url, paths, headers, options, options['duration']
+                )
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(
+                    {
+                        'meta': {
+                            'paths': paths,
+                            'concurrency': options['concurrency'],
+                            'duration': options['duration'],
+                            'cpu_count': os.cpu_count(),
+                        },
+                        'results': results,
+                    },
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+    @contextmanager
+    def server(self, mode, url, port):
+        """Запускает gunicorn в режиме mode или отдаёт готовый url."""
+        if mode is None:
+            yield url
+            return
+        process = subprocess.Popen(
+            (
+                sys.executable,
+                '-m',
+                'gunicorn',
+                '--config',
+                'gunicorn.conf.py',
+                '--bind',
+                f'127.0.0.1:{port}',
+            ),
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'SERVER_MODE': mode},
+        )
+        try:
+            self.wait_for_port(process, port)
+            self.stdout.write(f'Сервер {mode} запущен на порту {port}')
+            yield f'http://127.0.0.1:{port}'
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    @staticmethod
+    def wait_for_port(process, port, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(
+                    f'gunicorn завершился с кодом {process.returncode}'
+                )
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'gunicorn не открыл порт {port} за {timeout} с')
+
+    @staticmethod
+    def load(url, paths, headers, options, duration):
+        """Нагружает сервер в concurrency потоков duration секунд."""
+        address = urlsplit(url)
+        deadline = time.monotonic() + duration
+        timings = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(offset):
+            connection = HTTPConnection(address.hostname, address.port)
+            local_timings = []
+            local_errors = 0
+            index = offset
+            while time.monotonic() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                except (OSError, HTTPException):
+                    connection.close()
+                    local_errors += 1
+                    continue
+                if response.status >= 400:
+                    local_errors += 1
+                    continue
+                local_timings.append((time.perf_counter() - start) * 1000)
+            connection.close()
+            with lock:
+                timings.extend(local_timings)
+                errors.append(local_errors)
+
+        threads = [
+            threading.Thread(target=worker, args=(offset,))
+            for offset in range(options['concurrency'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if not timings:
+            raise CommandError(f'Нет успешных ответов от {url}')
+        return {
+            'requests': len(timings),
+            'errors': sum(errors),
+            'throughput_rps': round(len(timings) / elapsed, 1),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 0.95), 2),
+            'p99_ms': round(percentile(timings, 0.99), 2),
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"режим":24} {"запр/с":>8} {"медиана":>9} {"p95":>9} '
+            f'{"p99":>9} {"ошибки":>7}'
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:24} {result["throughput_rps"]:8.1f} '
+                f'{result["median_ms"]:9.2f} {result["p95_ms"]:9.2f} '
+                f'{result["p99_ms"]:9.2f} {result["errors"]:7}'
+            )
@@ -0,0 +1,84 @@
+"""Общие данные для тестов API."""
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingСart,
+    Tag,
+)
+from users.models import Subscribed, User
+
+
+def create_user(number):
+    return User.objects.create_user(
+        email=f'user{number}@example.com',
+        username=f'user{number}',
+        first_name='Имя',
+        last_name='Фамилия',
+        password='password-12345',
+    )
+
+
+def authorized_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+    )
+    return client
+
+
+def create_catalog():
+    """Три тега и шесть ингредиентов."""
+    tags = [
+        Tag.objects.create(
+            name=f'Тег {number}', color=f'#00000{number}', slug=f'tag{number}'
+        )
+        for number in range(3)
+    ]
+    ingredients = [
+        Ingredient.objects.create(name=name, measurement_unit='г')
+        for name in 'мука масло сахар соль молоко яйца'.split()
+    ]
+    return tags, ingredients
+
+
+def create_recipes(authors, tags, ingredients, count):
+    """count рецептов авторов по кругу, с двумя тегами и тремя
+    ингредиентами у каждого.
+    """
+    recipes = []
+    for number in range(count):
+        recipe = Recipe.objects.create(
+            author=authors[number % len(authors)],
+            name=f'Рецепт {number}',
+            text='Описание',
+            cooking_time=10,
+            image='recipes/images/recipe.png',
+        )
+        recipe.tags.set(
+            [tags[number % len(tags)], tags[(number + 1) % len(tags)]]
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient=ingredients[(number + shift) % len(ingredients)],
+                amount=number + shift + 1,
+            )
+            for shift in range(3)
+        )
+        recipes.append(recipe)
+    return recipes
+
+
+def create_relations(user, recipes, authors):
+    """Избранное и корзина user из recipes, подписки на authors."""
+    for recipe in recipes:
+        Favorite.objects.create(user=user, recipe=recipe)
+        ShoppingСart.objects.create(user=user, recipe=recipe)
+    for author in authors:
+        Subscribed.objects.create(user=user, author=author)
@@ -0,0 +1,83 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from api.v1.autocomplete import ingredient_index, search_ingredients
+from recipes.models import Ingredient
+
+NAMES = (
+    'Сахар',
+    'сахарная пудра',
+    'ванильный сахар',
+    'тростниковый сахар',
+    'соль',
+    'Сахарин',
+)
+
+
+class IngredientAutocompleteTest(TestCase):
+    """Подсказки ингредиентов: сначала по началу названия, затем по части."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in NAMES:
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.clear()
+
+    def names(self, query):
+        response = APIClient().get('/api/ingredients/', {'name': query})
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.json()]
+
+    def test_prefix_first(self):
+        self.assertEqual(
+            self.names('сах'),
+            [
+                'Сахар',
+                'Сахарин',
+                'сахарная пудра',
+                'ванильный сахар',
+                'тростниковый сахар',
+            ],
+        )
+
+    def test_case_and_spaces(self):
+        self.assertEqual(self.names(' САХАРН '), ['сахарная пудра'])
+
+    def test_nothing_found(self):
+        self.assertEqual(self.names('перец'), [])
+
+    def test_limit(self):
+        found = search_ingredients('сах', limit=2)
+        self.assertEqual(
+            found,
+            list(
+                Ingredient.objects.filter(
+                    name__in=['Сахар', 'Сахарин']
+                ).values_list('pk', flat=True)
+            ),
+        )
+
+    def test_full_list_without_query(self):
+        response = APIClient().get('/api/ingredients/')
+        self.assertEqual(len(response.json()), len(NAMES))
+
+
+class IngredientAutocompleteRefreshTest(TransactionTestCase):
+    """Новый ингредиент появляется в подсказках после пересборки."""
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.clear()
+        Ingredient.objects.create(name='сахар', measurement_unit='г')
+
+    def test_new_ingredient(self):
+        self.assertEqual(len(search_ingredients('сах')), 1)
+        Ingredient.objects.create(name='сахарная пудра', measurement_unit='г')
+        search_ingredients('сах')
+        if ingredient_index.rebuilding is not None:
+            ingredient_index.rebuilding.join()
+        self.assertEqual(len(search_ingredients('сах')), 2)
@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Tag
+
+
+class CatalogCacheTest(TestCase):
+    """Списки тегов и ингредиентов из кеша с ETag по содержимому."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(name='Завтрак', color='#000000', slug='a')
+        Ingredient.objects.create(name='соль', measurement_unit='г')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_cached_with_etag(self):
+        for url in ('/api/tags/', '/api/ingredients/'):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, 200)
+            with self.assertNumQueries(0):
+                second = self.client.get(url)
+            self.assertEqual(second.content, first.content)
+            self.assertEqual(second['ETag'], first['ETag'])
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, 304)
+
+    def test_etag_does_not_depend_on_version(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        cache.clear()
+        self.assertEqual(self.client.get('/api/tags/')['ETag'], etag)
+
+    def test_invalidated_by_edit(self):
+        etag = self.client.get('/api/tags/')['ETag']
+        self.tag.name = 'Обед'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.save()
+        response = self.client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['name'], 'Обед')
+
+    def test_new_ingredient_listed(self):
+        self.client.get('/api/ingredients/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='сахар', measurement_unit='г')
+        self.assertEqual(len(self.client.get('/api/ingredients/').json()), 2)
@@ -0,0 +1,54 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+
+from foodgram.db import check_connections, check_on_first_use
+from recipes.models import Tag
+
+
+@mock.patch.dict(connection.settings_dict, {'CONN_HEALTH_CHECKS': True})
+class ConnectionCheckTest(TransactionTestCase):
+    """Постоянное соединение проверяется лениво, раз за запрос.
+
+    Вне транзакции теста, как в настоящем запросе.
+    """
+
+    def setUp(self):
+        cache.clear()
+        Tag.objects.create(name='Тег', color='#000000', slug='tag')
+
+    def tearDown(self):
+        if check_on_first_use in connection.execute_wrappers:
+            connection.execute_wrappers.remove(check_on_first_use)
+
+    def test_once_per_request_on_first_query(self):
+        with mock.patch.object(
+            connection, 'is_usable', return_value=True
+        ) as is_usable:
+            response = self.client.get('/api/tags/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(is_usable.call_count, 1)
+            response = self.client.get('/api/tags/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(is_usable.call_count, 1)
+
+    def test_dead_connection_replaced(self):
+        with mock.patch.object(
+            connection, 'is_usable', return_value=False
+        ), mock.patch.object(
+            connection, 'close', wraps=connection.close
+        ) as close:
+            response = self.client.get('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['slug'], 'tag')
+        close.assert_called_once()
+
+    def test_not_checked_inside_transaction(self):
+        with mock.patch.object(
+            connection, 'is_usable', return_value=False
+        ) as is_usable, transaction.atomic():
+            check_connections()
+            self.assertTrue(Tag.objects.exists())
+        is_usable.assert_not_called()
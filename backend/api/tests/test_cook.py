@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from recipes.cooking import cooking_index
+from recipes.models import RecipeIngredient
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+URL = '/api/recipes/cook/'
+
+
+class CookTest(TestCase):
+    """Подбор рецептов по ингредиентам: порядок и обновление индекса."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags, cls.ingredients = create_catalog()
+        # Рецепт n состоит из ингредиентов n, n + 1 и n + 2.
+        cls.recipes = create_recipes(
+            [create_user(0)], tags, cls.ingredients, 4
+        )
+
+    def setUp(self):
+        cache.clear()
+        cooking_index.clear()
+        self.client = APIClient()
+
+    def cook(self, *numbers):
+        response = self.client.get(
+            URL,
+            {
+                'ingredients': ','.join(
+                    str(self.ingredients[number].pk) for number in numbers
+                )
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (recipe['id'], recipe['coverage'], recipe['missing_count'])
+            for recipe in response.json()['results']
+        ]
+
+    def test_ranking(self):
+        self.assertEqual(
+            self.cook(0, 1, 2),
+            [
+                (self.recipes[0].pk, 1.0, 0),
+                (self.recipes[1].pk, 0.67, 1),
+                (self.recipes[2].pk, 0.33, 2),
+            ],
+        )
+
+    def test_newer_recipe_first_on_tie(self):
+        self.assertEqual(
+            [row[0] for row in self.cook(3)],
+            [recipe.pk for recipe in reversed(self.recipes[1:])],
+        )
+
+    def test_no_ingredients(self):
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        self.assertEqual(
+            self.client.get(URL, {'ingredients': 'x'}).status_code, 400
+        )
+
+
+class CookIndexRefreshTest(TransactionTestCase):
+    """После изменения состава индекс пересобирается в фоне.
+
+    Поток сборки читает базу через своё соединение, поэтому данные
+    должны быть зафиксированы.
+    """
+
+    def setUp(self):
+        cache.clear()
+        cooking_index.clear()
+        tags, self.ingredients = create_catalog()
+        self.recipes = create_recipes(
+            [create_user(0)], tags, self.ingredients, 4
+        )
+        self.client = APIClient()
+
+    def cook(self):
+        response = self.client.get(
+            URL, {'ingredients': self.ingredients[0].pk}
+        )
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_previous_index_until_rebuilt(self):
+        self.assertEqual(self.cook(), [self.recipes[0].pk])
+        RecipeIngredient.objects.create(
+            recipe=self.recipes[3], ingredient=self.ingredients[0], amount=1
+        )
+        self.assertEqual(self.cook(), [self.recipes[0].pk])
+        cooking_index.rebuilding.join()
+        self.assertEqual(
+            self.cook(), [self.recipes[0].pk, self.recipes[3].pk]
+        )
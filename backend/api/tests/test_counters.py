@@ -0,0 +1,92 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from recipes.counters import COUNTERS
+from recipes.models import Favorite, Recipe, ShoppingСart
+from users.models import Subscribed, User
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_user,
+)
+
+
+class CountersTest(TestCase):
+    """Счётчики следуют за данными, расхождения находит сверка."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user(0)
+        cls.reader = create_user(1)
+        tags, ingredients = create_catalog()
+        cls.recipes = create_recipes([cls.author], tags, ingredients, 3)
+
+    def setUp(self):
+        self.client = authorized_client(self.reader)
+
+    def assertCounters(self):
+        recipe = Recipe.objects.get(pk=self.recipes[0].pk)
+        author = User.objects.get(pk=self.author.pk)
+        self.assertEqual(
+            recipe.favorites_count,
+            Favorite.objects.filter(recipe=recipe).count(),
+        )
+        self.assertEqual(
+            recipe.in_carts_count,
+            ShoppingСart.objects.filter(recipe=recipe).count(),
+        )
+        self.assertEqual(
+            author.recipes_count, Recipe.objects.filter(author=author).count()
+        )
+        self.assertEqual(
+            author.subscribers_count,
+            Subscribed.objects.filter(author=author).count(),
+        )
+        for counter in COUNTERS:
+            self.assertEqual(counter.mismatched(), [], counter)
+
+    def test_api_changes(self):
+        recipe_url = f'/api/recipes/{self.recipes[0].pk}'
+        subscribe_url = f'/api/users/{self.author.pk}/subscribe/'
+        for url in (
+            f'{recipe_url}/favorite/',
+            f'{recipe_url}/shopping_cart/',
+            subscribe_url,
+        ):
+            self.assertEqual(self.client.post(url).status_code, 201)
+            self.assertCounters()
+        # Повторное добавление отклоняется и счётчик не трогает.
+        self.assertEqual(
+            self.client.post(f'{recipe_url}/favorite/').status_code, 400
+        )
+        self.assertCounters()
+        for url in (
+            f'{recipe_url}/favorite/',
+            f'{recipe_url}/shopping_cart/',
+            subscribe_url,
+        ):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+            self.assertCounters()
+        self.recipes[1].delete()
+        self.assertCounters()
+
+    def test_drift_found_and_fixed(self):
+        Favorite.objects.bulk_create(
+            Favorite(user=self.reader, recipe=recipe)
+            for recipe in self.recipes
+        )
+        Recipe.objects.filter(pk=self.recipes[2].pk).update(
+            in_carts_count=7
+        )
+        with self.assertRaises(CommandError):
+            call_command('reconcile_counters', check=True, stdout=StringIO())
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertCounters()
+        for recipe in Recipe.objects.all():
+            self.assertEqual(recipe.favorites_count, 1)
+            self.assertEqual(recipe.in_carts_count, 0)
+        call_command('reconcile_counters', check=True, stdout=StringIO())
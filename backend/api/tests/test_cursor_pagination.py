@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+PAGE_SIZE = 4
+
+
+class CursorPaginationTest(TestCase):
+    """Обход курсором без пропусков и повторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [create_user(number) for number in range(5)]
+        cls.tags, cls.ingredients = create_catalog()
+        recipes = create_recipes(authors, cls.tags, cls.ingredients, 21)
+        # Группы рецептов с одинаковой датой: порядок держится на id.
+        now = timezone.now()
+        for number, recipe in enumerate(recipes):
+            Recipe.objects.filter(pk=recipe.pk).update(
+                pub_date=now - timezone.timedelta(minutes=number // 5)
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def walk(self, url, key='id', direction='next'):
+        """Значения key по всем страницам и последняя страница."""
+        values = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            page = [item[key] for item in data['results']]
+            values = values + page if direction == 'next' else page + values
+            url = data[direction]
+        return values, data
+
+    def expected_recipe_ids(self):
+        return list(
+            Recipe.objects.order_by('-pub_date', '-id').values_list(
+                'id', flat=True
+            )
+        )
+
+    def test_recipes_forward(self):
+        ids, _ = self.walk(
+            f'/api/recipes/?pagination=cursor&limit={PAGE_SIZE}'
+        )
+        self.assertEqual(ids, self.expected_recipe_ids())
+
+    def test_recipes_backward(self):
+        ids, last = self.walk(
+            f'/api/recipes/?pagination=cursor&limit={PAGE_SIZE}'
+        )
+        earlier, first = self.walk(last['previous'], direction='previous')
+        last_page = [item['id'] for item in last['results']]
+        self.assertEqual(earlier + last_page, ids)
+        self.assertIsNone(first['previous'])
+
+    def test_insert_during_walk(self):
+        response = self.client.get(
+            f'/api/recipes/?pagination=cursor&limit={PAGE_SIZE}'
+        )
+        first_page = [item['id'] for item in response.json()['results']]
+        create_recipes([create_user(99)], self.tags, self.ingredients, 1)
+        rest, _ = self.walk(response.json()['next'])
+        ids = first_page + rest
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids, self.expected_recipe_ids()[1:])
+
+    def test_users(self):
+        emails, _ = self.walk(
+            f'/api/users/?pagination=cursor&limit={PAGE_SIZE}', key='email'
+        )
+        self.assertEqual(emails, sorted(emails))
+        self.assertEqual(len(emails), 5)
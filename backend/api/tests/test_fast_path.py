@@ -0,0 +1,58 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.v1 import fastpath
+from foodgram.constants import THUMBNAIL_SIZES
+from recipes.models import Recipe
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+
+class FastPathParityTest(TestCase):
+    """Карточки из .values() совпадают с сериализатором байт в байт."""
+
+    @classmethod
+    def setUpTestData(cls):
+        authors = [create_user(number) for number in range(3)]
+        tags, ingredients = create_catalog()
+        cls.recipes = create_recipes(authors, tags, ingredients, 12)
+        Recipe.objects.filter(pk=cls.recipes[0].pk).update(
+            name='Кавычки " и \\ слэш, эмодзи 🍲',
+            text='Строки\u2028и абзацы\u2029<script>',
+        )
+        Recipe.objects.filter(pk=cls.recipes[1].pk).update(
+            thumbnails={
+                'source': cls.recipes[1].image.name,
+                **{
+                    variant: f'recipes/thumbnails/{variant}.webp'
+                    for variant in THUMBNAIL_SIZES
+                },
+            }
+        )
+        Recipe.objects.filter(pk=cls.recipes[2].pk).update(
+            thumbnails={'source': 'recipes/images/old.png'}
+        )
+        cls.recipes[3].tags.clear()
+
+    def test_parity(self):
+        output = StringIO()
+        call_command('check_fast_path', repeat=1, stdout=output)
+        self.assertIn(
+            f'Карточки совпадают байт в байт: {len(self.recipes)}',
+            output.getvalue(),
+        )
+
+    def test_mismatch_reported(self):
+        build_bodies = fastpath.build_bodies
+
+        def changed(recipe_ids, request=None):
+            bodies = build_bodies(recipe_ids, request)
+            bodies[self.recipes[0].pk]['name'] = 'Другое название'
+            return bodies
+
+        with mock.patch.object(fastpath, 'build_bodies', changed):
+            with self.assertRaises(CommandError):
+                call_command('check_fast_path', repeat=1, stdout=StringIO())
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorite, Recipe
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_user,
+)
+
+
+class PageCountTest(TestCase):
+    """Число записей в ответе верно после изменения данных."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        cls.tags, cls.ingredients = create_catalog()
+        cls.recipes = create_recipes(
+            [cls.user], cls.tags, cls.ingredients, 15
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = authorized_client(self.user)
+
+    def get(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/recipes/', params)
+        self.count_queries = sum(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        )
+        return response
+
+    def test_favorites_after_write(self):
+        for recipe in self.recipes[:14]:
+            Favorite.objects.create(user=self.user, recipe=recipe)
+        params = {'is_favorited': 1, 'limit': 100}
+        self.assertEqual(self.get(params).data['count'], 14)
+        with self.captureOnCommitCallbacks(execute=True):
+            Favorite.objects.create(user=self.user, recipe=self.recipes[14])
+        response = self.get(params)
+        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(len(response.data['results']), 15)
+
+    def test_cached_until_recipes_change(self):
+        self.assertEqual(self.get({'limit': 5}).data['count'], 15)
+        self.assertEqual(self.get({'limit': 5}).data['count'], 15)
+        self.assertEqual(self.count_queries, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_recipes([self.user], self.tags, self.ingredients, 1)
+        response = self.get({'limit': 5, 'page': 4})
+        self.assertEqual(response.data['count'], 16)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_pages_do_not_trust_count(self):
+        self.assertEqual(self.get({'limit': 5}).data['count'], 15)
+        # Без on_commit версия не меняется: число в кеше устарело.
+        create_recipes([self.user], self.tags, self.ingredients, 1)
+        response = self.get({'limit': 5, 'page': 3})
+        self.assertEqual(response.data['count'], 15)
+        self.assertIsNotNone(response.data['next'])
+        response = self.get({'limit': 5, 'page': 4})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+        Recipe.objects.filter(pk=self.recipes[0].pk).delete()
+        self.assertEqual(self.get({'limit': 5, 'page': 4}).status_code, 404)
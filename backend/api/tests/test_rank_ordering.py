@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from recipes import ranking
+from recipes.models import Favorite, Recipe, RecipeRank, ShoppingСart
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+
+class RankOrderingTest(TestCase):
+    """Ленты popular и trending читаются из таблицы рейтингов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [create_user(number) for number in range(3)]
+        cls.tags, ingredients = create_catalog()
+        cls.recipes = create_recipes(users[:1], cls.tags, ingredients, 5)
+        r0, r1, _, r3, _ = cls.recipes
+        for user in users[1:]:
+            Favorite.objects.create(user=user, recipe=r1)
+        Favorite.objects.filter(recipe=r1).update(
+            created=timezone.now() - timedelta(days=30)
+        )
+        Favorite.objects.create(user=users[1], recipe=r3)
+        ShoppingСart.objects.create(user=users[1], recipe=r3)
+        ShoppingСart.objects.create(user=users[2], recipe=r0)
+        ranking.rebuild()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def ids(self, **params):
+        response = self.client.get('/api/recipes/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['count'], [recipe['id'] for recipe in data['results']]
+
+    def order(self, *numbers):
+        return [self.recipes[number].pk for number in numbers]
+
+    def test_popular(self):
+        self.assertEqual(
+            self.ids(ordering='popular'), (5, self.order(1, 3, 0, 4, 2))
+        )
+
+    def test_trending(self):
+        self.assertEqual(
+            self.ids(ordering='trending'), (5, self.order(3, 0, 4, 2, 1))
+        )
+
+    def test_pages(self):
+        _, first = self.ids(ordering='popular', limit=2)
+        _, second = self.ids(ordering='popular', limit=2, page=2)
+        _, third = self.ids(ordering='popular', limit=2, page=3)
+        self.assertEqual(first + second + third, self.order(1, 3, 0, 4, 2))
+
+    def test_with_filter(self):
+        tag = self.tags[0]
+        expected = [
+            pk
+            for pk in self.order(1, 3, 0, 4, 2)
+            if Recipe.objects.filter(pk=pk, tags=tag).exists()
+        ]
+        self.assertEqual(
+            self.ids(ordering='popular', tags=tag.slug),
+            (len(expected), expected),
+        )
+
+    def test_unknown_ordering(self):
+        response = self.client.get('/api/recipes/', {'ordering': 'name'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_new_recipe_listed(self):
+        recipe = Recipe.objects.create(
+            author=self.recipes[0].author,
+            name='Новый',
+            text='Описание',
+            cooking_time=5,
+            image='recipes/images/recipe.png',
+        )
+        self.assertEqual(
+            self.ids(ordering='popular'),
+            (6, self.order(1, 3, 0) + [recipe.pk] + self.order(4, 2)),
+        )
+
+    def test_read_from_rank_index(self):
+        ranks = ranking.ranked_recipes(Recipe.objects.all(), 'popular')
+        sql = str(ranks.query)
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('ORDER BY', sql)
+        self.assertTrue(
+            sql.startswith(
+                f'SELECT "{RecipeRank._meta.db_table}"."recipe_id" FROM'
+            )
+        )
+
+
+class RankingRebuildTest(TestCase):
+    """Пересчёт рейтингов: строка у каждого рецепта, старые обнуляются."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        tags, ingredients = create_catalog()
+        cls.recipes = create_recipes([cls.user], tags, ingredients, 3)
+
+    def scores(self):
+        return dict(
+            RecipeRank.objects.values_list('recipe_id', 'popular')
+        )
+
+    def test_rebuild(self):
+        RecipeRank.objects.filter(recipe=self.recipes[2]).delete()
+        favorite = Favorite.objects.create(
+            user=self.user, recipe=self.recipes[0]
+        )
+        self.assertEqual(ranking.rebuild(), 1)
+        self.assertEqual(
+            self.scores(),
+            {
+                self.recipes[0].pk: 2,
+                self.recipes[1].pk: 0,
+                self.recipes[2].pk: 0,
+            },
+        )
+        favorite.delete()
+        Favorite.objects.create(user=self.user, recipe=self.recipes[1])
+        self.assertEqual(ranking.rebuild(), 1)
+        self.assertEqual(
+            self.scores(),
+            {
+                self.recipes[0].pk: 0,
+                self.recipes[1].pk: 2,
+                self.recipes[2].pk: 0,
+            },
+        )
@@ -0,0 +1,61 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Favorite, Recipe
+
+from .fixtures import authorized_client, create_user
+from .test_response_cache import CachedRecipesTestCase
+
+
+class RecipeBodyCacheTest(CachedRecipesTestCase):
+    """Общие карточки из кеша с отметками каждого пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fan = create_user(1)
+        cls.other = create_user(2)
+        Favorite.objects.create(user=cls.fan, recipe=cls.recipes[0])
+
+    def setUp(self):
+        super().setUp()
+        self.clients = {
+            user: authorized_client(user) for user in (self.fan, self.other)
+        }
+
+    def get(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.clients[user].get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.body_queries = [
+            query['sql']
+            for query in queries.captured_queries
+            if 'recipes_recipeingredient' in query['sql']
+        ]
+        return {
+            recipe['id']: recipe for recipe in response.json()['results']
+        }
+
+    def test_bodies_shared_between_users(self):
+        fan = self.get(self.fan)
+        self.assertTrue(self.body_queries)
+        other = self.get(self.other)
+        self.assertEqual(self.body_queries, [])
+        recipe_id = self.recipes[0].pk
+        self.assertTrue(fan[recipe_id]['is_favorited'])
+        self.assertFalse(other[recipe_id]['is_favorited'])
+        for recipe in other.values():
+            recipe.pop('is_favorited')
+            fan[recipe['id']].pop('is_favorited')
+        self.assertEqual(fan, other)
+
+    def test_body_rebuilt_after_edit(self):
+        self.get(self.other)
+        recipe = Recipe.objects.get(pk=self.recipes[1].pk)
+        self.change(recipe, name='Новое название')
+        recipes = self.get(self.other)
+        self.assertEqual(len(self.body_queries), 1)
+        self.assertEqual(recipes[recipe.pk]['name'], 'Новое название')
+        self.assertEqual(
+            recipes[self.recipes[0].pk]['name'], self.recipes[0].name
+        )
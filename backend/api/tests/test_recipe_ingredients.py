@@ -0,0 +1,111 @@
+import base64
+import io
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from recipes import shopping_list
+from recipes.models import RecipeIngredient, ShoppingСart
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_user,
+)
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def base64_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeIngredientsUpdateTest(TestCase):
+    """Правка рецепта меняет только изменившиеся строки ингредиентов."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = create_user(0)
+        self.tags, self.ingredients = create_catalog()
+        self.recipe = create_recipes(
+            [self.author], self.tags, self.ingredients, 1
+        )[0]
+        self.rows = {
+            row.ingredient_id: row
+            for row in RecipeIngredient.objects.filter(recipe=self.recipe)
+        }
+
+    def update(self, amounts):
+        response = authorized_client(self.author).patch(
+            f'/api/recipes/{self.recipe.pk}/',
+            {
+                'ingredients': [
+                    {'id': ingredient_id, 'amount': amount}
+                    for ingredient_id, amount in amounts.items()
+                ],
+                'tags': [tag.pk for tag in self.tags[:2]],
+                'image': base64_image(),
+                'name': self.recipe.name,
+                'text': self.recipe.text,
+                'cooking_time': self.recipe.cooking_time,
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return {
+            row.ingredient_id: row
+            for row in RecipeIngredient.objects.filter(recipe=self.recipe)
+        }
+
+    def test_unchanged_rows_keep_ids(self):
+        rows = self.update(
+            {pk: row.amount for pk, row in self.rows.items()}
+        )
+        self.assertEqual(
+            {pk: row.pk for pk, row in rows.items()},
+            {pk: row.pk for pk, row in self.rows.items()},
+        )
+
+    def test_diff(self):
+        kept, changed, removed = self.rows
+        added = next(
+            ingredient.pk
+            for ingredient in self.ingredients
+            if ingredient.pk not in self.rows
+        )
+        rows = self.update(
+            {
+                kept: self.rows[kept].amount,
+                changed: self.rows[changed].amount + 10,
+                added: 5,
+            }
+        )
+        self.assertEqual(set(rows), {kept, changed, added})
+        self.assertEqual(rows[kept].pk, self.rows[kept].pk)
+        self.assertEqual(rows[changed].pk, self.rows[changed].pk)
+        self.assertEqual(rows[changed].amount, self.rows[changed].amount + 10)
+        self.assertEqual(rows[added].amount, 5)
+        self.assertNotIn(removed, rows)
+
+    def test_shopping_lists_follow_diff(self):
+        buyer = create_user(1)
+        ShoppingСart.objects.create(user=buyer, recipe=self.recipe)
+        kept, changed, removed = self.rows
+        self.update({kept: 1, changed: 2})
+        self.assertEqual(
+            shopping_list.stored_amounts([buyer.pk])[buyer.pk],
+            {kept: 1, changed: 2},
+        )
+        self.assertEqual(shopping_list.find_mismatches(), [])
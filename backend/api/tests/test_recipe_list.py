@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_relations,
+    create_user,
+)
+
+SMALL_PAGE = 6
+LARGE_PAGE = 50
+
+
+class RecipeListQueriesTest(TestCase):
+    """Число запросов списка рецептов не зависит от размера страницы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        authors = [create_user(number) for number in range(1, 4)]
+        tags, ingredients = create_catalog()
+        recipes = create_recipes(authors, tags, ingredients, LARGE_PAGE)
+        create_relations(cls.user, recipes[::2], authors[:2])
+
+    def setUp(self):
+        cache.clear()
+
+    def assertSameQueries(self, client, url):
+        """Страницы из SMALL_PAGE и LARGE_PAGE рецептов без кеша."""
+        with CaptureQueriesContext(connection) as small:
+            response = client.get(url, {'limit': SMALL_PAGE})
+        self.assertEqual(len(response.data['results']), SMALL_PAGE)
+        cache.clear()
+        with self.assertNumQueries(len(small.captured_queries)):
+            response = client.get(url, {'limit': LARGE_PAGE})
+        self.assertEqual(len(response.data['results']), LARGE_PAGE)
+
+    def test_anonymous(self):
+        self.assertSameQueries(APIClient(), '/api/recipes/')
+
+    def test_authorized(self):
+        self.assertSameQueries(
+            authorized_client(self.user), '/api/recipes/'
+        )
+
+    def test_authorized_filtered(self):
+        self.assertSameQueries(
+            authorized_client(self.user),
+            '/api/recipes/?tags=tag0&tags=tag1',
+        )
+
+    def test_viewer_relations(self):
+        response = authorized_client(self.user).get(
+            '/api/recipes/', {'limit': LARGE_PAGE}
+        )
+        favorited = [
+            recipe['is_favorited'] for recipe in response.data['results']
+        ]
+        self.assertEqual(favorited.count(True), LARGE_PAGE // 2)
+        self.assertTrue(
+            all(
+                recipe['is_in_shopping_cart'] == recipe['is_favorited']
+                for recipe in response.data['results']
+            )
+        )
@@ -0,0 +1,133 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.v1.mixins import AnonymousCacheMixin
+from recipes.models import Ingredient, Tag
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_user,
+)
+
+
+class CachedRecipesTestCase(TestCase):
+    """Три рецепта одного автора, пустой кеш перед каждым тестом."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user(0)
+        cls.tags, cls.ingredients = create_catalog()
+        cls.recipes = create_recipes(
+            [cls.author], cls.tags, cls.ingredients, 3
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def change(self, instance, **fields):
+        """Сохраняет изменения так, как после фиксации транзакции."""
+        for name, value in fields.items():
+            setattr(instance, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+
+
+class AnonymousCacheTest(CachedRecipesTestCase):
+    """Готовые ответы для анонимов и их сброс при изменении данных."""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.recipe = self.recipes[0]
+        self.detail = f'/api/recipes/{self.recipe.pk}/'
+
+    def get(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_hit_without_queries(self):
+        for url in ('/api/recipes/', self.detail):
+            first = self.get(url)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.get(url), first)
+
+    def test_key_includes_params_and_host(self):
+        self.get('/api/recipes/?limit=1')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get('/api/recipes/?limit=2')
+        self.assertTrue(queries.captured_queries)
+        self.assertEqual(len(data['results']), 2)
+        other_host = self.get(self.detail, HTTP_HOST='localhost')
+        self.assertTrue(other_host['image'].startswith('http://localhost/'))
+        self.assertTrue(
+            self.get(self.detail)['image'].startswith('http://testserver/')
+        )
+
+    def test_recipe_edit(self):
+        self.get('/api/recipes/')
+        self.get(self.detail)
+        self.change(self.recipe, name='Новое название')
+        self.assertEqual(self.get(self.detail)['name'], 'Новое название')
+        recipes = self.get('/api/recipes/')['results']
+        self.assertIn(
+            'Новое название', [recipe['name'] for recipe in recipes]
+        )
+
+    def test_tag_edit(self):
+        self.get(self.detail)
+        tag = Tag.objects.get(pk=self.recipe.tags.first().pk)
+        self.change(tag, name='Новый тег')
+        self.assertIn(
+            'Новый тег', [tag['name'] for tag in self.get(self.detail)['tags']]
+        )
+
+    def test_ingredient_edit(self):
+        self.get(self.detail)
+        ingredient = Ingredient.objects.get(
+            pk=self.recipe.ingredients.first().pk
+        )
+        self.change(ingredient, name='новый ингредиент')
+        self.assertIn(
+            'новый ингредиент',
+            [item['name'] for item in self.get(self.detail)['ingredients']],
+        )
+
+    def test_author_edit(self):
+        self.get('/api/recipes/')
+        self.change(self.author, first_name='Другое')
+        self.assertEqual(
+            {
+                recipe['author']['first_name']
+                for recipe in self.get('/api/recipes/')['results']
+            },
+            {'Другое'},
+        )
+
+    def test_not_for_authorized(self):
+        self.get('/api/recipes/')
+        client = authorized_client(create_user(1))
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/recipes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries.captured_queries)
+
+
+class AnonymousCacheMixinTest(SimpleTestCase):
+    """Зависимости ответа обязательны."""
+
+    def test_dependencies_required(self):
+        with self.assertRaises(ImproperlyConfigured):
+            type('View', (AnonymousCacheMixin,), {})
+
+    def test_dependencies_attribute(self):
+        view = type(
+            'View', (AnonymousCacheMixin,), {'cache_dependencies': ('tags',)}
+        )
+        self.assertEqual(view().get_cache_dependencies(), ('tags',))
@@ -0,0 +1,132 @@
+from unittest import skipUnless
+
+from django.contrib.postgres.search import SearchVector
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Value
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from foodgram.constants import SEARCH_CONFIG
+from recipes.models import Recipe
+from recipes.search import recipe_index, search_recipes
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+
+class RecipeSearchTest(TestCase):
+    """Поиск: лучшие совпадения первыми, с фильтрами и страницами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags, ingredients = create_catalog()
+        cls.recipes = create_recipes(
+            [create_user(0)], tags, ingredients, 10
+        )
+        for number, recipe in enumerate(cls.recipes[:6]):
+            Recipe.objects.filter(pk=recipe.pk).update(
+                name='Суп, грибы' if number == 0 else f'Суп {number}',
+                text='Грибы и картофель' if number < 3 else 'Овощи',
+            )
+
+    def setUp(self):
+        cache.clear()
+        recipe_index.clear()
+        self.client = APIClient()
+
+    def search(self, **params):
+        response = self.client.get('/api/recipes/', params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['count'], [recipe['id'] for recipe in data['results']]
+
+    def test_name_outweighs_text(self):
+        count, ids = self.search(search='грибы')
+        self.assertEqual(count, 3)
+        self.assertEqual(ids[0], self.recipes[0].pk)
+        self.assertEqual(
+            set(ids), {recipe.pk for recipe in self.recipes[:3]}
+        )
+
+    def test_pages(self):
+        count, first = self.search(search='суп', limit=4)
+        _, second = self.search(search='суп', limit=4, page=2)
+        self.assertEqual(count, 6)
+        self.assertEqual(len(first), 4)
+        self.assertEqual(
+            set(first + second), {recipe.pk for recipe in self.recipes[:6]}
+        )
+
+    def test_with_filter(self):
+        count, ids = self.search(search='суп', tags='tag0')
+        expected = {
+            recipe.pk
+            for recipe in self.recipes[:6]
+            if recipe.tags.filter(slug='tag0').exists()
+        }
+        self.assertEqual(count, len(expected))
+        self.assertEqual(set(ids), expected)
+
+    def test_nothing_found(self):
+        self.assertEqual(self.search(search='пирог'), (0, []))
+
+
+class RecipeSearchRefreshTest(TransactionTestCase):
+    """Новый рецепт находится после пересборки индекса, а ответ
+    по прежнему индексу не остаётся в кеше анонимов.
+    """
+
+    def setUp(self):
+        cache.clear()
+        recipe_index.clear()
+        tags, ingredients = create_catalog()
+        self.author = create_user(0)
+        self.recipes = create_recipes([self.author], tags, ingredients, 2)
+        self.client = APIClient()
+
+    def search(self):
+        response = self.client.get('/api/recipes/', {'search': 'борщ'})
+        return [recipe['id'] for recipe in response.json()['results']]
+
+    def test_new_recipe_found(self):
+        self.assertEqual(self.search(), [])
+        recipe = Recipe.objects.create(
+            author=self.author,
+            name='Борщ',
+            text='Свёкла',
+            cooking_time=60,
+            image='recipes/images/recipe.png',
+        )
+        self.search()
+        if recipe_index.rebuilding is not None:
+            recipe_index.rebuilding.join()
+        self.assertEqual(self.search(), [recipe.pk])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Поиск в базе только на PG')
+class SearchVectorTriggerTest(TestCase):
+    """Триггер пересчитывает search_vector только по названию и тексту."""
+
+    @classmethod
+    def setUpTestData(cls):
+        tags, ingredients = create_catalog()
+        cls.recipe = create_recipes([create_user(0)], tags, ingredients, 1)[0]
+
+    def found(self, query):
+        return list(
+            search_recipes(Recipe.objects.all(), query).values_list(
+                'pk', flat=True
+            )
+        )
+
+    def test_name_change(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(name='Грибной суп')
+        self.assertEqual(self.found('грибы'), [self.recipe.pk])
+
+    def test_other_columns_keep_vector(self):
+        recipes = Recipe.objects.filter(pk=self.recipe.pk)
+        recipes.update(
+            search_vector=SearchVector(Value('маркер'), config=SEARCH_CONFIG)
+        )
+        recipes.update(cooking_time=99)
+        self.assertEqual(self.found('маркер'), [self.recipe.pk])
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+
+from recipes.models import Ingredient, ShoppingСart
+
+from .fixtures import (
+    authorized_client,
+    create_catalog,
+    create_recipes,
+    create_user,
+)
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingListExportTest(TestCase):
+    """Выгрузка списка покупок в разных форматах и её ETag."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(0)
+        tags, cls.ingredients = create_catalog()
+        cls.recipes = create_recipes([cls.user], tags, cls.ingredients, 2)
+        for recipe in cls.recipes:
+            ShoppingСart.objects.create(user=cls.user, recipe=recipe)
+        # Рецепт 0: ингредиенты 0, 1, 2; рецепт 1: 1, 2, 3.
+        cls.expected = sorted(
+            [
+                ('мука', 'г', 1),
+                ('масло', 'г', 2 + 2),
+                ('сахар', 'г', 3 + 3),
+                ('соль', 'г', 4),
+            ]
+        )
+
+    def setUp(self):
+        self.client = authorized_client(self.user)
+
+    def download(self, export_format, **headers):
+        return self.client.get(URL, {'type': export_format}, **headers)
+
+    def content(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_txt(self):
+        response = self.download('txt')
+        text = self.content(response).decode()
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(self.user.username, text)
+        self.assertEqual(
+            [line for line in text.splitlines() if line.startswith('- ')],
+            [
+                f'- {name} ({unit}) - {amount}'
+                for name, unit, amount in self.expected
+            ],
+        )
+
+    def test_csv(self):
+        response = self.download('csv')
+        rows = list(csv.reader(io.StringIO(self.content(response).decode())))
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        self.assertEqual(rows[0], ['name', 'measurement_unit', 'amount'])
+        self.assertEqual(
+            [(name, unit, int(amount)) for name, unit, amount in rows[1:]],
+            self.expected,
+        )
+
+    def test_json(self):
+        data = json.loads(self.content(self.download('json')))
+        self.assertEqual(
+            [
+                (row['name'], row['measurement_unit'], row['amount'])
+                for row in data
+            ],
+            self.expected,
+        )
+
+    def test_pdf(self):
+        response = self.download('pdf')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(self.content(response).startswith(b'%PDF'))
+        self.assertIn('.pdf', response['Content-Disposition'])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.download('xlsx').status_code, 400)
+
+    def test_not_modified(self):
+        etag = self.download('txt')['ETag']
+        response = self.download('txt', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.download('csv')['ETag'], etag)
+
+    def test_etag_follows_cart(self):
+        etag = self.download('txt')['ETag']
+        ShoppingСart.objects.filter(recipe=self.recipes[1]).delete()
+        response = self.download('txt', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('соль', self.content(response).decode())
+
+    def test_etag_follows_ingredient_rename(self):
+        etag = self.download('txt')['ETag']
+        Ingredient.objects.filter(pk=self.ingredients[0].pk).update(
+            name='ржаная мука'
+        )
+        response = self.download('txt', HTTP_IF_NONE_MATCH=etag)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('ржаная мука', self.content(response).decode())
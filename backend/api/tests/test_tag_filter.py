@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+
+from .fixtures import create_catalog, create_recipes, create_user
+
+RECIPES_COUNT = 9
+
+
+class TagFilterTest(TestCase):
+    """Отбор рецептов по нескольким тегам."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tags, ingredients = create_catalog()
+        create_recipes([create_user(0)], cls.tags, ingredients, RECIPES_COUNT)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def ids(self, tags):
+        response = self.client.get(
+            '/api/recipes/', {'tags': tags, 'limit': RECIPES_COUNT}
+        )
+        self.assertEqual(response.status_code, 200)
+        ids = [recipe['id'] for recipe in response.data['results']]
+        self.assertEqual(response.data['count'], len(ids))
+        return ids
+
+    def test_any_tag_without_duplicates(self):
+        ids = self.ids(['tag0', 'tag1'])
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            set(ids),
+            set(
+                Recipe.objects.filter(
+                    tags__slug__in=['tag0', 'tag1']
+                ).values_list('id', flat=True)
+            ),
+        )
+
+    def test_all_tags(self):
+        self.assertEqual(len(self.ids(['tag0', 'tag1', 'tag2'])), 9)
+
+    def test_unknown_slug(self):
+        response = self.client.get('/api/recipes/', {'tags': 'missing'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_renamed_slug(self):
+        tag = self.tags[0]
+        expected = set(self.ids(['tag0']))
+        tag.slug = 'renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.save()
+        self.assertEqual(set(self.ids(['renamed'])), expected)
@@ -0,0 +1,90 @@
+"""Поиск ингредиентов по началу и части названия.
+
+Сначала идут ингредиенты, название которых начинается с запроса,
+затем содержащие его. На PostgreSQL запрос обслуживают префиксный
+и триграммный индексы, на SQLite - отсортированный список названий
+в памяти процесса.
+"""
+
+import hashlib
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+
+from foodgram.constants import (
+    INGREDIENT_SEARCH_CACHE_TIMEOUT,
+    INGREDIENT_SEARCH_LIMIT,
+)
+from recipes.cache import LocalIndex, get_version
+from recipes.models import Ingredient
+
+
+class IngredientIndex:
+    """Отсортированные названия ингредиентов для поиска без базы."""
+
+    def __init__(self, rows):
+        self.entries = sorted((name.lower(), pk) for pk, name in rows)
+        self.names = [name for name, _ in self.entries]
+
+    @classmethod
+    def load(cls):
+        """Индекс по ингредиентам из базы."""
+        return cls(Ingredient.objects.values_list('pk', 'name'))
+
+    def search(self, query, limit):
+        """id ингредиентов: сначала по началу названия, затем по части."""
+        found = []
+        start = bisect_left(self.names, query)
+        for name, pk in self.entries[start:]:
+            if not name.startswith(query) or len(found) >= limit:
+                break
+            found.append(pk)
+        if len(found) < limit:
+            prefixed = set(found)
+            for name, pk in self.entries:
+                if query in name and pk not in prefixed:
+                    found.append(pk)
+                    if len(found) >= limit:
+                        break
+        return found
+
+
+ingredient_index = LocalIndex('ingredients', IngredientIndex.load)
+
+
+def search_database(query, limit):
+    """Поиск средствами базы с ранжированием префиксных совпадений."""
+    return list(
+        Ingredient.objects.filter(name__icontains=query)
+        .annotate(
+            is_substring=Case(
+                When(name__istartswith=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by('is_substring', 'name')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def search_ingredients(query, limit=INGREDIENT_SEARCH_LIMIT):
+    """id подходящих ингредиентов в порядке выдачи."""
+    query = query.strip().lower()
+    version = get_version('ingredients')
+    key = 'ingredients:search:{}:{}:{}'.format(
+        version, limit, hashlib.sha1(query.encode()).hexdigest()
+    )
+    found = cache.get(key)
+    if found is not None:
+        return found
+    if connection.vendor == 'postgresql':
+        found, current = search_database(query, limit), True
+    else:
+        index, current = ingredient_index.lookup(version)
+        found = index.search(query, limit)
+    if current:
+        cache.set(key, found, INGREDIENT_SEARCH_CACHE_TIMEOUT)
+    return found
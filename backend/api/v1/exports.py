@@ -0,0 +1,168 @@
+import csv
+import hashlib
+import json
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils.http import quote_etag
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from foodgram.constants import (
+    FILE_NAME,
+    PDF_FONT_SIZE,
+    PDF_MARGIN,
+    SHOPPING_LIST_BUFFER_SIZE,
+)
+
+
+class Echo:
+    """Буфер для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def render_txt(user, ingredients, today):
+    """Текстовый список покупок."""
+    yield (
+        f'Список покупок для пользователя: {user.username}\n\n'
+        f'Дата: {today:%Y-%m-%d}\n\n'
+    )
+    separator = ''
+    for ingredient in ingredients:
+        yield (
+            f'{separator}- {ingredient["ingredient__name"]} '
+            f'({ingredient["ingredient__measurement_unit"]})'
+            f' - {ingredient["amount"]}'
+        )
+        separator = '\n'
+    yield f'\n\nFoodgram ({today:%Y})'
+
+
+def render_csv(user, ingredients, today):
+    """Список покупок в CSV."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for ingredient in ingredients:
+        yield writer.writerow(
+            (
+                ingredient['ingredient__name'],
+                ingredient['ingredient__measurement_unit'],
+                ingredient['amount'],
+            )
+        )
+
+
+def render_json(user, ingredients, today):
+    """Список покупок в JSON."""
+    yield '['
+    separator = ''
+    for ingredient in ingredients:
+        yield separator + json.dumps(
+            {
+                'name': ingredient['ingredient__name'],
+                'measurement_unit': ingredient['ingredient__measurement_unit'],
+                'amount': ingredient['amount'],
+            },
+            ensure_ascii=False,
+        )
+        separator = ', '
+    yield ']'
+
+
+def get_pdf_font():
+    """Шрифт с кириллицей, если он есть в системе."""
+    if 'ShoppingList' in pdfmetrics.getRegisteredFontNames():
+        return 'ShoppingList'
+    if not os.path.exists(settings.PDF_FONT_PATH):
+        return 'Helvetica'
+    pdfmetrics.registerFont(TTFont('ShoppingList', settings.PDF_FONT_PATH))
+    return 'ShoppingList'
+
+
+def render_pdf(user, ingredients, today):
+    """Список покупок в PDF.
+
+    PDF нельзя отдавать по частям до записи таблицы ссылок,
+    поэтому документ собирается целиком и отдаётся одним блоком.
+    """
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    font = get_pdf_font()
+    _, height = A4
+    y = height - PDF_MARGIN
+    pdf.setFont(font, PDF_FONT_SIZE)
+    text = ''.join(render_txt(user, ingredients, today))
+    for line in text.splitlines():
+        if y < PDF_MARGIN:
+            pdf.showPage()
+            pdf.setFont(font, PDF_FONT_SIZE)
+            y = height - PDF_MARGIN
+        pdf.drawString(PDF_MARGIN, y, line)
+        y -= PDF_FONT_SIZE * 1.5
+    pdf.save()
+    yield buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    'txt': (render_txt, 'text/plain; charset=utf-8'),
+    'csv': (render_csv, 'text/csv; charset=utf-8'),
+    'json': (render_json, 'application/json; charset=utf-8'),
+    'pdf': (render_pdf, 'application/pdf'),
+}
+
+
+def buffered(chunks, size=SHOPPING_LIST_BUFFER_SIZE):
+    """Склеивает мелкие строки в блоки, чтобы не писать по одной."""
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def shopping_cart_etag(user, export_format, today, rows):
+    """ETag по строкам списка покупок, формату и дате выгрузки.
+
+    rows - те же словари с названием, единицей и количеством, которые
+    пишутся в файл.
+    """
+    digest = hashlib.sha1(
+        f'{user.username}:{export_format}:{today:%Y-%m-%d}'.encode()
+    )
+    for row in rows:
+        digest.update(
+            repr(
+                (
+                    row['ingredient__name'],
+                    row['ingredient__measurement_unit'],
+                    row['amount'],
+                )
+            ).encode()
+        )
+    return quote_etag(digest.hexdigest())
+
+
+def shopping_cart_response(user, export_format, today, ingredients, etag):
+    """Потоковый ответ со списком покупок в выбранном формате."""
+    render, content_type = EXPORT_FORMATS[export_format]
+    chunks = render(user, ingredients, today)
+    if export_format != 'pdf':
+        chunks = buffered(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename={user.username}_{FILE_NAME}.{export_format}'
+    )
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,101 @@
+"""Общие карточки рецептов из .values() без сериализаторов DRF.
+
+Собирает те же словари, что RecipeListSerializer.to_body, тремя
+запросами на пачку рецептов: рецепты с авторами, теги и ингредиенты.
+Совпадение с сериализатором проверяет команда check_fast_path.
+"""
+
+from collections import defaultdict
+
+from recipes.models import Recipe, RecipeIngredient
+
+
+def get_tags(recipe_ids):
+    """Теги рецептов в порядке TagSerializer: {recipe_id: [tag]}."""
+    tags = defaultdict(list)
+    for recipe_id, tag_id, name, color, slug in (
+        Recipe.tags.through.objects.filter(recipe_id__in=recipe_ids)
+        .order_by('tag__name')
+        .values_list(
+            'recipe_id', 'tag_id', 'tag__name', 'tag__color', 'tag__slug'
+        )
+    ):
+        tags[recipe_id].append(
+            {'id': tag_id, 'name': name, 'color': color, 'slug': slug}
+        )
+    return tags
+
+
+def get_ingredients(recipe_ids):
+    """Ингредиенты рецептов с количеством: {recipe_id: [ingredient]}."""
+    ingredients = defaultdict(list)
+    for recipe_id, ingredient_id, name, measurement_unit, amount in (
+        RecipeIngredient.objects.filter(recipe_id__in=recipe_ids)
+        .order_by('id')
+        .values_list(
+            'recipe_id',
+            'ingredient_id',
+            'ingredient__name',
+            'ingredient__measurement_unit',
+            'amount',
+        )
+    ):
+        ingredients[recipe_id].append(
+            {
+                'id': ingredient_id,
+                'name': name,
+                'measurement_unit': measurement_unit,
+                'amount': amount,
+            }
+        )
+    return ingredients
+
+
+def build_bodies(recipe_ids, request=None):
+    """Общие карточки рецептов: {recipe_id: body}.
+
+    Ссылки на изображения полные, если передан запрос, как у полей
+    сериализатора.
+    """
+    absolute = request.build_absolute_uri if request else str
+    tags = get_tags(recipe_ids)
+    ingredients = get_ingredients(recipe_ids)
+    bodies = {}
+    for row in Recipe.objects.filter(pk__in=recipe_ids).values(
+        'id',
+        'name',
+        'image',
+        'thumbnails',
+        'text',
+        'cooking_time',
+        'author_id',
+        'author__email',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+    ):
+        recipe = Recipe(image=row['image'], thumbnails=row['thumbnails'])
+        bodies[row['id']] = {
+            'id': row['id'],
+            'tags': tags[row['id']],
+            'author': {
+                'email': row['author__email'],
+                'id': row['author_id'],
+                'username': row['author__username'],
+                'first_name': row['author__first_name'],
+                'last_name': row['author__last_name'],
+                'is_subscribed': False,
+            },
+            'ingredients': ingredients[row['id']],
+            'is_favorited': False,
+            'is_in_shopping_cart': False,
+            'name': row['name'],
+            'image': absolute(recipe.image.url) if recipe.image else None,
+            'thumbnails': {
+                variant: absolute(url)
+                for variant, url in recipe.get_thumbnails().items()
+            },
+            'text': row['text'],
+            'cooking_time': row['cooking_time'],
+        }
+    return bodies
@@ -1,24 +1,85 @@
+from django.core.cache import cache
+from django.db.models import Case, Exists, OuterRef, When
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe
+from foodgram.constants import CATALOG_CACHE_TIMEOUT, RECIPE_ORDERINGS
+from recipes.cache import get_version
+from recipes.models import Ingredient, Recipe, Tag
+from recipes.search import search_in_database, search_recipes
+
+from .autocomplete import search_ingredients
+
+
+def get_tag_ids():
+    """Словарь slug -> id тегов из кеша текущей версии справочника."""
+    key = f'tags:ids:{get_version("tags")}'
+    tag_ids = cache.get(key)
+    if tag_ids is None:
+        tag_ids = dict(Tag.objects.order_by().values_list('slug', 'id'))
+        cache.set(key, tag_ids, CATALOG_CACHE_TIMEOUT)
+    return tag_ids
+
+
+class TagSlugsFilter(filters.MultipleChoiceFilter):
+    """Рецепты с любым из тегов.
+
+    Slug переводятся в id по кешированному словарю, отбор идёт через
+    EXISTS по таблице связи: без JOIN, дублей строк и DISTINCT.
+    """
+
+    @property
+    def field(self):
+        self.extra['choices'] = [(slug, slug) for slug in get_tag_ids()]
+        return super().field
+
+    def filter(self, queryset, value):
+        if not value:
+            return queryset
+        tag_ids = get_tag_ids()
+        return queryset.filter(
+            Exists(
+                Recipe.tags.through.objects.filter(
+                    recipe_id=OuterRef('pk'),
+                    tag_id__in=[tag_ids[slug] for slug in value],
+                )
+            )
+        )
 
 
 class IngredientFilter(FilterSet):
     """Фильтр ингридиентов."""
 
-    name = filters.CharFilter(lookup_expr='icontains')
+    name = filters.CharFilter(method='name_filter')
 
     class Meta:
         model = Ingredient
         fields = ('name',)
 
+    def name_filter(self, queryset, name, value):
+        """Подсказки по названию: совпадения с начала идут первыми."""
+        found = search_ingredients(value)
+        if not found:
+            return queryset.none()
+        return queryset.filter(pk__in=found).order_by(
+            Case(
+                *(
+                    When(pk=pk, then=position)
+                    for position, pk in enumerate(found)
+                )
+            )
+        )
+
 
 class RecipeFilter(FilterSet):
-    tags = filters.AllValuesMultipleFilter(field_name='tags__slug')
+    tags = TagSlugsFilter()
     is_favorited = filters.BooleanFilter(method='is_favorited_filter')
     is_in_shopping_cart = filters.BooleanFilter(
         method='is_in_shopping_cart_filter'
     )
+    search = filters.CharFilter(method='search_filter')
+    ordering = filters.ChoiceFilter(
+        choices=RECIPE_ORDERINGS, method='ordering_filter'
+    )
 
     class Meta:
         model = Recipe
@@ -35,3 +96,21 @@ class RecipeFilter(FilterSet):
         if value:
             return queryset.filter(shoppingcart__user=user)
         return queryset
+
+    def search_filter(self, queryset, name, value):
+        """Полнотекстовый поиск, самые подходящие рецепты первыми.
+
+        Без поиска в базе (SQLite) рецепты ранжируются в памяти при
+        разбиении на страницы, см. RecipeViewSet.paginate_queryset.
+        """
+        if not search_in_database():
+            return queryset
+        return search_recipes(queryset, value)
+
+    def ordering_filter(self, queryset, name, value):
+        """Сортировка по заранее посчитанному рейтингу рецепта.
+
+        Страница выбирается по таблице рейтингов, а не сортировкой
+        рецептов, см. RecipeViewSet.paginate_queryset.
+        """
+        return queryset
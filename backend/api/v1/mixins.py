@@ -0,0 +1,149 @@
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag, urlencode
+
+from foodgram.constants import ANONYMOUS_CACHE_TIMEOUT, CATALOG_CACHE_TIMEOUT
+from recipes.cache import get_version, get_versions
+
+from .renderers import FastJSONRenderer
+
+
+class CachedListMixin:
+    """Отдаёт полный список справочника готовым JSON из кеша.
+
+    Ключ кеша строится по версии справочника, поэтому изменение данных
+    сразу даёт новый ответ. ETag - хеш самого ответа: он совпадает у
+    всех процессов, даже если версии в их локальных кешах разные.
+    Запросы с параметрами и не в JSON обрабатываются как обычно.
+    """
+
+    cache_version_name = None
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params or request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        version = get_version(self.cache_version_name)
+        key = f'catalog:{self.cache_version_name}:{version}'
+        entry = cache.get(key)
+        if entry is None:
+            content = FastJSONRenderer().render(
+                self.get_serializer(
+                    self.filter_queryset(self.get_queryset()), many=True
+                ).data
+            )
+            entry = {
+                'content': content,
+                'etag': quote_etag(hashlib.sha1(content).hexdigest()),
+            }
+            cache.set(key, entry, CATALOG_CACHE_TIMEOUT)
+        response = get_conditional_response(request, etag=entry['etag'])
+        if response is None:
+            response = HttpResponse(
+                entry['content'], content_type='application/json'
+            )
+        response['ETag'] = entry['etag']
+        return response
+
+
+class AnonymousCacheMixin:
+    """Отдаёт анонимам готовые ответы списка и карточки из кеша.
+
+    Ключ строится по схеме и хосту (в ответе абсолютные ссылки на
+    картинки), пути, отсортированным параметрам запроса и типу ответа.
+    Вместе с ответом хранятся версии данных, из которых он собран
+    (cache_dependencies или get_cache_dependencies, если они зависят
+    от запроса); если хоть одна версия сменилась, ответ
+    собирается заново. Версии читаются до сборки ответа, поэтому
+    изменение во время сборки не закрепит устаревший ответ в кеше;
+    ответ из заведомо устаревших данных вьюсет помечает, сбрасывая
+    anonymous_cacheable.
+
+    С локальным кешем (LocMemCache) у каждого процесса свои версии:
+    изменение, сделанное в другом процессе, станет видно здесь только
+    через CACHE_VERSION_TIMEOUT. Для нескольких процессов нужен общий
+    кеш (см. проверку foodgram.W002).
+    """
+
+    cache_dependencies = None
+    anonymous_cacheable = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if (
+            cls.cache_dependencies is None
+            and cls.get_cache_dependencies
+            is AnonymousCacheMixin.get_cache_dependencies
+        ):
+            raise ImproperlyConfigured(
+                f'{cls.__name__}: задайте cache_dependencies '
+                'или get_cache_dependencies.'
+            )
+
+    def get_cache_dependencies(self):
+        """Имена версий данных, от которых зависит ответ."""
+        return self.cache_dependencies
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_for_anonymous(
+            request, super().list, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_for_anonymous(
+            request, super().retrieve, *args, **kwargs
+        )
+
+    def get_anonymous_cache_key(self, request):
+        query = urlencode(
+            sorted(
+                (name, value)
+                for name, values in request.query_params.lists()
+                for value in values
+            )
+        )
+        url = f'{request.build_absolute_uri(request.path)}?{query}'
+        digest = hashlib.sha1(
+            f'{request.accepted_media_type}:{url}'.encode()
+        ).hexdigest()
+        return f'anonymous:{self.action}:{digest}'
+
+    def cached_for_anonymous(self, request, handler, *args, **kwargs):
+        if (
+            request.method != 'GET'
+            or request.user.is_authenticated
+            or request.accepted_renderer.format != 'json'
+        ):
+            return handler(request, *args, **kwargs)
+        versions = get_versions(self.get_cache_dependencies())
+        key = self.get_anonymous_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None and entry['versions'] == versions:
+            return HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and self.anonymous_cacheable:
+            response.anonymous_cache = (key, versions)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if hasattr(response, 'anonymous_cache'):
+            key, versions = response.anonymous_cache
+            response.render()
+            cache.set(
+                key,
+                {
+                    'versions': versions,
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                },
+                ANONYMOUS_CACHE_TIMEOUT,
+            )
+        return response
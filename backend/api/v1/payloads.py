@@ -0,0 +1,85 @@
+"""Карточки рецептов из общего кеша с отметками текущего пользователя.
+
+Карточка рецепта одинакова для всех, кроме отметок избранного, корзины
+и подписки на автора. Общая часть хранится в кеше по id рецепта вместе
+с версиями данных, из которых собрана: страница списка собирается одним
+чтением из кеша, из базы загружаются только устаревшие карточки,
+а отметки подставляются поверх из ViewerRelations.
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Manager
+
+from foodgram.constants import RECIPE_BODY_CACHE_TIMEOUT
+from recipes.cache import get_many_with_versions
+
+from .relations import ViewerRelations, ViewerRelationsListSerializer
+
+BODY_DEPENDENCIES = ('tags', 'ingredients', 'authors')
+
+
+def get_body_key(recipe_id, base_url):
+    """Ключ карточки; ссылки на изображения зависят от адреса сайта."""
+    digest = hashlib.sha1(base_url.encode()).hexdigest()[:12]
+    return f'recipe:body:{recipe_id}:{digest}'
+
+
+def get_body_versions(versions, recipe_id):
+    return {
+        name: versions[name]
+        for name in (*BODY_DEPENDENCIES, f'recipe:{recipe_id}')
+    }
+
+
+class RecipeBodyListSerializer(ViewerRelationsListSerializer):
+    """Список рецептов из закешированных общих карточек.
+
+    Рецепты на входе могут быть загружены без связанных данных:
+    устаревшие карточки собираются заново по id из .values().
+    """
+
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        request = self.context.get('request')
+        relations = ViewerRelations.for_request(request)
+        self.child.prime_relations(relations, recipes)
+        base_url = request.build_absolute_uri('/') if request else ''
+        keys = {
+            recipe.id: get_body_key(recipe.id, base_url) for recipe in recipes
+        }
+        entries, versions = get_many_with_versions(
+            keys.values(),
+            BODY_DEPENDENCIES + tuple(f'recipe:{pk}' for pk in keys),
+        )
+        bodies = {}
+        for recipe_id, key in keys.items():
+            entry = entries.get(key)
+            if entry is not None and entry['versions'] == get_body_versions(
+                versions, recipe_id
+            ):
+                bodies[recipe_id] = entry['body']
+        rendered = self.render_bodies(recipes, keys.keys() - bodies.keys())
+        cache.set_many(
+            {
+                keys[recipe_id]: {
+                    'versions': get_body_versions(versions, recipe_id),
+                    'body': body,
+                }
+                for recipe_id, body in rendered.items()
+            },
+            RECIPE_BODY_CACHE_TIMEOUT,
+        )
+        bodies.update(rendered)
+        return [
+            self.child.overlay(bodies[recipe.id], relations)
+            for recipe in recipes
+            if recipe.id in bodies
+        ]
+
+    def render_bodies(self, recipes, recipe_ids):
+        """Общие карточки рецептов recipe_ids: {recipe_id: body}."""
+        if not recipe_ids:
+            return {}
+        return self.child.build_bodies(recipe_ids)
@@ -0,0 +1,85 @@
+from django.db.models import Manager
+from rest_framework.serializers import ListSerializer
+
+from recipes.models import Favorite, ShoppingСart
+from users.models import Subscribed
+
+
+class ViewerRelations:
+    """Связи текущего пользователя с рецептами и авторами.
+
+    Хранится на запросе: идентификаторы избранного, корзины и подписок
+    загружаются одним запросом на каждый вид связи для всей страницы,
+    дальше ответы берутся из множеств в памяти.
+    """
+
+    RELATIONS = {
+        'favorite': (Favorite, 'recipe_id'),
+        'shopping_cart': (ShoppingСart, 'recipe_id'),
+        'subscribed': (Subscribed, 'author_id'),
+    }
+
+    def __init__(self, user):
+        self.user = user
+        self._checked = {name: set() for name in self.RELATIONS}
+        self._found = {name: set() for name in self.RELATIONS}
+
+    @classmethod
+    def for_request(cls, request):
+        """Возвращает общий для запроса экземпляр."""
+        if request is None:
+            return cls(None)
+        relations = getattr(request, '_viewer_relations', None)
+        if relations is None:
+            relations = cls(request.user)
+            request._viewer_relations = relations
+        return relations
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    def prime(self, recipe_ids=(), author_ids=()):
+        """Загружает связи для рецептов и авторов страницы."""
+        self._load('favorite', recipe_ids)
+        self._load('shopping_cart', recipe_ids)
+        self._load('subscribed', author_ids)
+
+    def is_favorited(self, recipe_id):
+        return self._has('favorite', recipe_id)
+
+    def is_in_shopping_cart(self, recipe_id):
+        return self._has('shopping_cart', recipe_id)
+
+    def is_subscribed(self, author_id):
+        return self._has('subscribed', author_id)
+
+    def _load(self, name, ids):
+        if not self.is_authenticated:
+            return
+        missing = set(ids) - self._checked[name]
+        if not missing:
+            return
+        model, field = self.RELATIONS[name]
+        self._found[name].update(
+            model.objects.filter(
+                user=self.user, **{f'{field}__in': missing}
+            ).values_list(field, flat=True)
+        )
+        self._checked[name].update(missing)
+
+    def _has(self, name, obj_id):
+        self._load(name, (obj_id,))
+        return obj_id in self._found[name]
+
+
+class ViewerRelationsListSerializer(ListSerializer):
+    """Список, заранее загружающий связи пользователя для всех объектов."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, Manager) else data
+        self.child.prime_relations(
+            ViewerRelations.for_request(self.context.get('request')),
+            iterable,
+        )
+        return super().to_representation(iterable)
@@ -0,0 +1,53 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+# Числа, которые orjson записывает не так, как repr(float): очень
+# маленькие и очень большие. Совпадение внутри строки лишь отправляет
+# ответ на стандартный json.
+FLOAT_MISMATCH = re.compile(rb'[0-9]e|0\.0000|[0-9]{17}\.')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен.
+
+    Ответ совпадает с JSONRenderer байт в байт: даты, Decimal и прочие
+    типы кодирует тот же JSONEncoder, U+2028 и U+2029 экранируются так
+    же. Ответы с отступами, в ASCII, с числами, которые orjson пишет
+    иначе, и всё, что orjson не умеет, собираются стандартным json.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            content = None
+        if content is None or FLOAT_MISMATCH.search(content):
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
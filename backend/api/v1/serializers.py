@@ -1,3 +1,5 @@
+from django.db import transaction
+from django.db.models import Prefetch
 from django.forms import ValidationError
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework.serializers import (
@@ -9,6 +11,9 @@ from rest_framework.serializers import (
 )
 from rest_framework.validators import UniqueTogetherValidator
 
+from api.v1 import fastpath
+from api.v1.payloads import RecipeBodyListSerializer
+from api.v1.relations import ViewerRelations, ViewerRelationsListSerializer
 from foodgram.constants import (
     ADD_SUBSCRIDED_UNIQUE,
     ADD_SUBSCRIDED_VALIDATE,
@@ -24,6 +29,7 @@ from foodgram.constants import (
     NONE_TEGS,
     SHOPING_LIST,
 )
+from recipes import shopping_list
 from recipes.models import (
     Favorite,
     Ingredient,
@@ -40,9 +46,7 @@ class SubscribedSerializer(UserSerializer):
     """Сереалайзер Подписок. для GET запроса"""
 
     recipes = SerializerMethodField(method_name='get_recipes', read_only=True)
-    recipes_count = SerializerMethodField(
-        method_name='get_recipes_count', read_only=True
-    )
+    recipes_count = ReadOnlyField()
 
     class Meta(UserSerializer.Meta):
         fields = UserSerializer.Meta.fields + (
@@ -56,21 +60,22 @@ class SubscribedSerializer(UserSerializer):
             'first_name',
         )
 
-    def get_recipes_count(self, obj):
-        """Метод получения колличества рецепта."""
-        return obj.recipes.count()
-
-    def get_recipes(self, object):
-        """Метод получение рецепта."""
+    @staticmethod
+    def get_recipes_limit(request):
+        """Метод получения лимита рецептов из запроса."""
         try:
-            limit = int(
-                self.context['request'].query_params.get(
-                    'recipes_limit', default=0
-                )
-            )
+            return int(request.query_params.get('recipes_limit', default=0))
         except ValueError:
             raise ValueError(LIMIT_RECIPE)
-        author_recipes = object.recipes.all()[:limit]
+
+    def get_recipes(self, object):
+        """Метод получение рецепта."""
+        if hasattr(object, 'limited_recipes'):
+            author_recipes = object.limited_recipes
+        else:
+            author_recipes = object.recipes.all()[
+                : self.get_recipes_limit(self.context['request'])
+            ]
         return RecipeSerializer(author_recipes, many=True).data
 
 
@@ -124,12 +129,13 @@ class RecipeSerializer(ModelSerializer):
     """Список рецептов без ингридиентов."""
 
     image = ReadOnlyField(source='image.url')
+    thumbnails = ReadOnlyField(source='get_thumbnails')
     name = ReadOnlyField()
     cooking_time = ReadOnlyField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'thumbnails', 'cooking_time')
 
 
 class RecipeIngredientSerializer(ModelSerializer):
@@ -157,6 +163,7 @@ class RecipeListSerializer(ModelSerializer):
     is_favorited = SerializerMethodField()
     is_in_shopping_cart = SerializerMethodField()
     image = Base64ImageField()
+    thumbnails = SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -169,31 +176,99 @@ class RecipeListSerializer(ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'thumbnails',
             'text',
             'cooking_time',
         )
+        list_serializer_class = RecipeBodyListSerializer
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Автор, теги и ингредиенты одним запросом на каждый вид."""
+        return queryset.select_related('author').prefetch_related(
+            'tags',
+            Prefetch(
+                'recipes',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                ).order_by('id'),
+            ),
+        )
+
+    @classmethod
+    def load_recipes(cls, recipe_ids):
+        """Рецепты со связанными данными: {recipe_id: recipe}."""
+        return cls.setup_eager_loading(Recipe.objects.all()).in_bulk(
+            recipe_ids
+        )
+
+    @staticmethod
+    def prime_relations(relations, recipes):
+        """Загрузка избранного, корзины и подписок для страницы рецептов."""
+        relations.prime(
+            recipe_ids=[recipe.id for recipe in recipes],
+            author_ids=[recipe.author_id for recipe in recipes],
+        )
+
+    @staticmethod
+    def overlay(body, relations):
+        """Подставляет в карточку отметки пользователя."""
+        body['is_favorited'] = relations.is_favorited(body['id'])
+        body['is_in_shopping_cart'] = relations.is_in_shopping_cart(body['id'])
+        body['author']['is_subscribed'] = relations.is_subscribed(
+            body['author']['id']
+        )
+        return body
+
+    def build_bodies(self, recipe_ids):
+        """Общие карточки рецептов из .values(): {recipe_id: body}."""
+        return fastpath.build_bodies(recipe_ids, self.context.get('request'))
+
+    def to_body(self, recipe):
+        """Общая для всех пользователей карточка рецепта.
+
+        Эталон для build_bodies, см. команду check_fast_path.
+        """
+        return self.overlay(
+            self.to_representation(recipe), ViewerRelations(None)
+        )
+
+    def get_thumbnails(self, obj):
+        """Полные ссылки на миниатюры, как у поля image."""
+        request = self.context.get('request')
+        thumbnails = obj.get_thumbnails()
+        if request is None:
+            return thumbnails
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in thumbnails.items()
+        }
 
     def get_is_favorited(self, obj):
         """Проверка - находится ли рецепт в избранном."""
-        request = self.context.get('request')
-        return bool(
-            request
-            and request.user.is_authenticated
-            and request.user.favorite.filter(
-                recipe=obj, user=request.user
-            ).exists()
-        )
+        return ViewerRelations.for_request(
+            self.context.get('request')
+        ).is_favorited(obj.id)
 
     def get_is_in_shopping_cart(self, obj):
         """Проверка - находится ли рецепт в списке покупок."""
-        request = self.context.get('request')
-        return bool(
-            request
-            and request.user.is_authenticated
-            and request.user.shoppingcart.filter(
-                recipe=obj, user=request.user
-            ).exists()
+        return ViewerRelations.for_request(
+            self.context.get('request')
+        ).is_in_shopping_cart(obj.id)
+
+
+class RecipeCookSerializer(RecipeListSerializer):
+    """Рецепт в подборке по ингредиентам с долей имеющихся."""
+
+    coverage = ReadOnlyField()
+    missing_count = ReadOnlyField()
+
+    class Meta(RecipeListSerializer.Meta):
+        fields = RecipeListSerializer.Meta.fields + (
+            'coverage',
+            'missing_count',
         )
+        list_serializer_class = ViewerRelationsListSerializer
 
 
 class GetIngredientSerilizer(ModelSerializer):
@@ -259,18 +334,62 @@ class RecipeCreateSerializer(ModelSerializer):
         """Вспомогательный метод для обработки
         создания объектов RecipeIngredient.
         """
-        recipe.ingredients.clear()
-        recipe_ingredients = []
-        for ingredient_data in ingredients_data:
-            ingredient_id = ingredient_data['id']
-            amount = ingredient_data['amount']
-            recipe_ingredients.append(
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient_data['id'],
+                amount=ingredient_data['amount'],
+            )
+            for ingredient_data in ingredients_data
+        )
+
+    @staticmethod
+    def update_recipe_ingredients(recipe, ingredients_data):
+        """Приводит ингредиенты рецепта к новому составу.
+
+        Удаляются, обновляются и добавляются только изменившиеся строки.
+        Возвращает прежний и новый состав: {ingredient_id: amount}.
+        """
+        existing = {
+            recipe_ingredient.ingredient_id: recipe_ingredient
+            for recipe_ingredient in RecipeIngredient.objects.filter(
+                recipe=recipe
+            )
+        }
+        old_amounts = {
+            ingredient_id: recipe_ingredient.amount
+            for ingredient_id, recipe_ingredient in existing.items()
+        }
+        new_amounts = {
+            ingredient_data['id']: ingredient_data['amount']
+            for ingredient_data in ingredients_data
+        }
+        removed = old_amounts.keys() - new_amounts.keys()
+        if removed:
+            RecipeIngredient.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, amount in new_amounts.items():
+            recipe_ingredient = existing.get(ingredient_id)
+            if recipe_ingredient and recipe_ingredient.amount != amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ['amount'])
+        added = new_amounts.keys() - old_amounts.keys()
+        if added:
+            RecipeIngredient.objects.bulk_create(
                 RecipeIngredient(
-                    recipe=recipe, ingredient_id=ingredient_id, amount=amount
+                    recipe=recipe,
+                    ingredient_id=ingredient_id,
+                    amount=new_amounts[ingredient_id],
                 )
+                for ingredient_id in added
             )
-        RecipeIngredient.objects.bulk_create(recipe_ingredients)
+        return old_amounts, new_amounts
 
+    @transaction.atomic
     def create(self, validated_data):
         """Создание рецепта."""
 
@@ -282,12 +401,21 @@ class RecipeCreateSerializer(ModelSerializer):
         self.create_recipe_ingredients(recipe, ingredients_data)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        """Редактирование рецепта."""
+        """Редактирование рецепта.
+
+        Строка рецепта блокируется до конца транзакции, чтобы
+        параллельные правки не считали разницу от устаревшего состава.
+        """
+        Recipe.objects.select_for_update().only('pk').get(pk=instance.pk)
         tags_data = validated_data.pop('tags', None)
         instance.tags.set(tags_data)
         ingredients_data = validated_data.pop('ingredients', None)
-        self.create_recipe_ingredients(instance, ingredients_data)
+        shopping_list.recipe_ingredients_changed(
+            instance,
+            *self.update_recipe_ingredients(instance, ingredients_data),
+        )
         return super().update(instance, validated_data)
 
     def to_representation(self, instance):
@@ -1,8 +1,7 @@
 from datetime import datetime as dt
 
-from django.db.models import Sum
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import response, status
 from rest_framework.decorators import action
@@ -10,21 +9,41 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 
 from api.v1.filters import IngredientFilter, RecipeFilter
-from foodgram.constants import FAVORITE_RECIPE_DELETE, FILE_NAME
+from foodgram.constants import (
+    COOK_INGREDIENTS_ERROR,
+    EXPORT_FORMAT_ERROR,
+    FAVORITE_RECIPE_DELETE,
+    RECIPE_ORDERINGS,
+    SHOPPING_LIST_CHUNK_SIZE,
+)
+from recipes import ranking
+from recipes.cooking import cooking_index
 from recipes.models import (
     Favorite,
     Ingredient,
     Recipe,
-    RecipeIngredient,
+    ShoppingListIngredient,
     ShoppingСart,
     Tag,
 )
-from users.pagination import LimitPageNumberPagination
+from recipes.search import (
+    recipe_index,
+    search_in_database,
+    search_recipe_ids,
+)
+from users.pagination import OptionalKeysetPagination
 
+from .exports import (
+    EXPORT_FORMATS,
+    shopping_cart_etag,
+    shopping_cart_response,
+)
+from .mixins import AnonymousCacheMixin, CachedListMixin
 from .permission import IsAuthorOrReadOnly
 from .serializers import (
     FavoriteSerializer,
     IngredientSerializer,
+    RecipeCookSerializer,
     RecipeCreateSerializer,
     RecipeListSerializer,
     ShoppingСartSerializer,
@@ -36,18 +55,20 @@ def my_custom_page_not_found_view(request, exception):
     return render(request, '404.html', status=404)
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, ReadOnlyModelViewSet):
     """Вьюсет тегов."""
 
+    cache_version_name = 'tags'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (AllowAny,)
     pagination_class = None
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(CachedListMixin, ReadOnlyModelViewSet):
     """Вьюсет ингридеентов."""
 
+    cache_version_name = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
@@ -56,20 +77,96 @@ class IngredientViewSet(ReadOnlyModelViewSet):
     filterset_class = IngredientFilter
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(AnonymousCacheMixin, ModelViewSet):
     """Вью сет для рецептов."""
 
     queryset = Recipe.objects.all()
     permission_classes = (IsAuthorOrReadOnly,)
     filter_backends = [DjangoFilterBackend]
     filterset_class = RecipeFilter
-    pagination_class = LimitPageNumberPagination
+    pagination_class = OptionalKeysetPagination
+
+    @property
+    def keyset_ordering(self):
+        """Ключ курсорной пагинации; для рейтингов и поиска её нет."""
+        params = self.request.query_params
+        if (
+            self.action == 'cook'
+            or params.get('ordering')
+            or params.get('search')
+        ):
+            return None
+        return ('-pub_date', '-id')
+
+    def get_cache_dependencies(self):
+        """Версии данных в ответе для анонимов.
+
+        Карточка зависит только от своего рецепта, список - от всех
+        рецептов, а с сортировкой по рейтингу ещё и от рейтингов.
+        """
+        names = ['tags', 'ingredients', 'authors']
+        if self.action == 'retrieve':
+            return names + [f'recipe:{self.kwargs["pk"]}']
+        names.append('recipe_pages')
+        if self.request.query_params.get('ordering'):
+            names.append('ranks')
+        return names
+
+    def get_count_dependencies(self):
+        """Версии данных, от которых зависит число рецептов в списке.
+
+        Отбор по избранному и корзине зависит от пользователя и меняется
+        без смены версий, поэтому такие списки считаются каждый раз.
+        """
+        params = self.request.query_params
+        if 'is_favorited' in params or 'is_in_shopping_cart' in params:
+            return None
+        return ['recipe_pages']
+
+    def paginate_queryset(self, queryset):
+        """Страница рецептов по рейтингу или по поиску без базы.
+
+        Как в cook: страница берётся из упорядоченных id рецептов
+        (по индексу рейтингов и/или по поисковому индексу в памяти),
+        из базы загружаются только рецепты этой страницы. Ответ по
+        прежнему, ещё пересобираемому индексу анонимам не кешируется.
+        """
+        if self.action != 'list':
+            return super().paginate_queryset(queryset)
+        ordering = self.request.query_params.get('ordering')
+        query = self.request.query_params.get('search', '').strip()
+        recipe_ids = None
+        if ordering in dict(RECIPE_ORDERINGS):
+            recipe_ids = ranking.ranked_recipes(queryset, ordering)
+        if query and not search_in_database():
+            index, self.anonymous_cacheable = recipe_index.lookup()
+            recipe_ids = search_recipe_ids(
+                queryset if recipe_ids is None else recipe_ids, query, index
+            )
+        if recipe_ids is None:
+            return super().paginate_queryset(queryset)
+        page = super().paginate_queryset(recipe_ids)
+        recipes = queryset.in_bulk(page)
+        return [recipes[pk] for pk in page if pk in recipes]
+
+    def get_queryset(self):
+        """Рецепты с подгруженными автором, тегами и ингредиентами.
+
+        Количество запросов на страницу не зависит от её размера.
+        Для списка загружаются только ключи: карточки берутся из кеша
+        и догружаются по id только устаревшие.
+        """
+        if self.action == 'list':
+            return Recipe.objects.only('id', 'author_id', 'pub_date')
+        return RecipeListSerializer.setup_eager_loading(Recipe.objects.all())
 
     def get_serializer_class(self):
         """Метод определения сереолайзера"""
 
         if self.action in ('list', 'retrieve'):
             return RecipeListSerializer
+        if self.action == 'cook':
+            return RecipeCookSerializer
         return RecipeCreateSerializer
 
     @staticmethod
@@ -85,29 +182,81 @@ class RecipeViewSet(ModelViewSet):
         )
 
     @staticmethod
-    def create_shopping_cart_file(self, request, ingredients):
-        """Кастомный метод создания списка. покупок"""
-        user = self.request.user
-        filename = f'{user.username}_{FILE_NAME}'
+    def create_shopping_cart_file(request, export_format):
+        """Кастомный метод создания списка покупок.
+
+        Список читается из сводной таблицы и отдаётся потоком
+        по серверному курсору, повторная выгрузка неизменного списка
+        возвращает 304. ETag считается по тем же строкам, что попадают
+        в файл, поэтому переименование ингредиента его тоже меняет.
+        """
+        user = request.user
         today = dt.today()
-        shopping_list = (
-            f'Список покупок для пользователя: {user.username}\n\n'
-            f'Дата: {today:%Y-%m-%d}\n\n'
+        rows = (
+            ShoppingListIngredient.objects.filter(user=user)
+            .values(
+                'ingredient__name', 'ingredient__measurement_unit', 'amount'
+            )
+            .order_by('ingredient__name')
         )
-        shopping_list += '\n'.join(
-            [
-                f'- {ingredient["ingredient__name"]} '
-                f'({ingredient["ingredient__measurement_unit"]})'
-                f' - {ingredient["amount"]}'
-                for ingredient in ingredients
-            ]
+        etag = shopping_cart_etag(
+            user,
+            export_format,
+            today,
+            rows.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE),
         )
-        shopping_list += f'\n\nFoodgram ({today:%Y})'
-        response = HttpResponse(
-            shopping_list, content_type='text.txt; charset=utf-8'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        return shopping_cart_response(
+            user,
+            export_format,
+            today,
+            rows.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE),
+            etag,
+        )
+
+    @staticmethod
+    def get_ingredient_ids(request):
+        """id ингредиентов из ?ingredients=1&ingredients=2 или 1,2."""
+        return {
+            int(ingredient_id)
+            for value in request.query_params.getlist('ingredients')
+            for ingredient_id in value.split(',')
+            if ingredient_id.strip()
+        }
+
+    @action(detail=False, methods=['get'], permission_classes=(AllowAny,))
+    def cook(self, request):
+        """Что приготовить из имеющихся ингредиентов.
+
+        Рецепты сортируются по доле своих ингредиентов, которые есть
+        в запросе; на страницу загружаются только найденные рецепты.
+        """
+        try:
+            ingredient_ids = self.get_ingredient_ids(request)
+        except ValueError:
+            ingredient_ids = None
+        if not ingredient_ids:
+            return response.Response(
+                {'detail': COOK_INGREDIENTS_ERROR},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        page = self.paginate_queryset(cooking_index.get().rank(ingredient_ids))
+        recipes = self.get_queryset().in_bulk(
+            [recipe_id for recipe_id, _, _ in page]
+        )
+        results = []
+        for recipe_id, matched, total in page:
+            recipe = recipes.get(recipe_id)
+            if recipe is None:
+                continue
+            recipe.coverage = round(matched / total, 2)
+            recipe.missing_count = total - matched
+            results.append(recipe)
+        return self.get_paginated_response(
+            self.get_serializer(results, many=True).data
         )
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-        return response
 
     @action(
         detail=True, methods=['post'], permission_classes=(IsAuthenticated,)
@@ -146,13 +295,18 @@ class RecipeViewSet(ModelViewSet):
         detail=False, methods=['get'], permission_classes=(IsAuthenticated,)
     )
     def download_shopping_cart(self, request):
-        """Метод получения списка покупок"""
-        ingredients = (
-            RecipeIngredient.objects.filter(
-                recipe__shoppingcart__user=self.request.user
+        """Метод получения списка покупок.
+
+        Формат задаётся параметром type: txt, csv, json или pdf.
+        """
+        export_format = request.query_params.get('type', 'txt')
+        if export_format not in EXPORT_FORMATS:
+            return response.Response(
+                {
+                    'detail': EXPORT_FORMAT_ERROR.format(
+                        ', '.join(EXPORT_FORMATS)
+                    )
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            .values('ingredient__name', 'ingredient__measurement_unit')
-            .order_by('ingredient__name')
-            .annotate(amount=Sum('amount'))
-        )
-        return self.create_shopping_cart_file(self, request, ingredients)
+        return self.create_shopping_cart_file(request, export_format)
@@ -7,8 +7,40 @@ LENGTH_FOR_COLOR = 7
 MIN_COUNT = 1
 MAXIMUM_COUNT = 1000
 DEFAULT_COLOR = '#ffd057'
-FILE_NAME = 'shopping_cart.txt'
+FILE_NAME = 'shopping_cart'
+SHOPPING_LIST_BUFFER_SIZE = 8192
+SHOPPING_LIST_CHUNK_SIZE = 2000
+SHOPPING_LIST_BATCH_SIZE = 1000
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
+INGREDIENT_SEARCH_LIMIT = 50
+INGREDIENT_SEARCH_CACHE_TIMEOUT = 60 * 60
+CATALOG_CACHE_TIMEOUT = 60 * 60
+ANONYMOUS_CACHE_TIMEOUT = 10 * 60
+RECIPE_BODY_CACHE_TIMEOUT = 60 * 60
+COUNT_CACHE_TIMEOUT = 30
+COUNT_ESTIMATE_THRESHOLD = 10000
+IMPORT_BATCH_SIZE = 1000
+SEED_BATCH_SIZE = 10000
+SEARCH_CONFIG = 'russian'
+SEARCH_MIN_STEM = 3
+COOKING_INDEX_CHUNK_SIZE = 2000
+RANK_FAVORITE_WEIGHT = 2
+RANK_CART_WEIGHT = 1
+RANK_BATCH_SIZE = 1000
+TRENDING_WINDOW_DAYS = 14
+TRENDING_HALF_LIFE_DAYS = 3
+IMPORT_READ_SIZE = 64 * 1024
+IMPORT_MAX_ITEM_SIZE = 64 * 1024
 DIRICTORY_PATH = 'recipe_img/'
+THUMBNAIL_PATH = 'recipe_img/thumbnails/'
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_SIZES = {
+    'card': (480, 480),
+    'detail': (1200, 1200),
+    'admin': (160, 160),
+}
 MAXIMUMTIME = 360
 FAVORITE_RECIPE = 'У вас уже есть это рецепт'
 SHOPING_LIST = 'Уже добавленно в карзину. Пора за покупочками'
@@ -32,6 +64,17 @@ SUBCRIDE_DELETE = 'Успешная отписка'
 LIMIT_RECIPE = 'recipes_limit должен быть целым числом'
 ADD_SUBSCRIDED_UNIQUE = "Вы уже подписались на этого пользователя"
 ADD_SUBSCRIDED_VALIDATE = "Вы не можете подписаться на самого себя"
+IMPORT_HEADER_ERROR = 'Неверные заголовки у файла'
+IMPORT_JSON_ERROR = 'Файл JSON оборван или повреждён около символа {}'
+COOK_INGREDIENTS_ERROR = (
+    'Укажите id ингредиентов: ?ingredients=1&ingredients=2 или 1,2'
+)
+EXPORT_FORMAT_ERROR = 'Формат списка покупок должен быть одним из: {}'
+
+RECIPE_ORDERINGS = (
+    ('popular', 'Популярные'),
+    ('trending', 'В тренде'),
+)
 
 INGREDIENT_UNITS = (
     ('г', 'граммы'),
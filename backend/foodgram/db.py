@@ -0,0 +1,72 @@
+"""Постоянные соединения с базой: проверка при первом запросе и настроек.
+
+Django 3.2 не умеет CONN_HEALTH_CHECKS (появилось в 4.1): постоянное
+соединение, оборванное базой или PgBouncer, ломает первый запрос после
+простоя. Здесь сделано то же, что в Django 4.1: сигнал request_started
+только отмечает соединения, оставшиеся от прошлого запроса, а проверка
+(SELECT 1) идёт лениво, перед первым SQL-запросом. Ответы из кеша базу
+не трогают и на проверку не тратятся; мёртвое соединение закрывается,
+и запрос выполняется на новом.
+"""
+
+import django
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.core.signals import request_started
+from django.db import connections
+
+NATIVE_HEALTH_CHECKS = django.VERSION >= (4, 1)
+
+
+def check_on_first_use(execute, sql, params, many, context):
+    """Обёртка запросов: проверяет отмеченное соединение один раз.
+
+    Внутри транзакции соединение не переоткрывается: это оборвало бы
+    транзакцию, поэтому запрос просто выполняется.
+    """
+    connection = context['connection']
+    if connection.health_check_pending:
+        connection.health_check_pending = False
+        if not connection.in_atomic_block and not connection.is_usable():
+            cursor = context['cursor']
+            connection.close()
+            connection.ensure_connection()
+            cursor.cursor = connection.create_cursor(
+                getattr(cursor.cursor, 'name', None)
+            )
+    return execute(sql, params, many, context)
+
+
+def check_connections(**kwargs):
+    """Отмечает постоянные соединения для проверки при первом запросе."""
+    if NATIVE_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if not connection.settings_dict.get('CONN_HEALTH_CHECKS'):
+            continue
+        if check_on_first_use not in connection.execute_wrappers:
+            # В начало списка: execute_wrapper() снимает последнюю обёртку.
+            connection.execute_wrappers.insert(0, check_on_first_use)
+        connection.health_check_pending = connection.connection is not None
+
+
+request_started.connect(check_connections)
+
+
+@register()
+def check_database_settings(app_configs, **kwargs):
+    """Предупреждает о настройках, при которых соединения не живут."""
+    errors = []
+    for alias, database in settings.DATABASES.items():
+        if 'postgresql' not in database['ENGINE']:
+            continue
+        if database.get('CONN_MAX_AGE', 0) == 0:
+            errors.append(
+                Warning(
+                    f'База {alias}: соединение открывается заново '
+                    'на каждый запрос.',
+                    hint='Задайте DB_CONN_MAX_AGE, например 60.',
+                    id='foodgram.W001',
+                )
+            )
+    return errors
@@ -0,0 +1,160 @@
+"""Метрики запросов в памяти процесса и их вывод для Prometheus.
+
+Каждый процесс gunicorn копит свои метрики, поэтому Prometheus
+должен опрашивать процессы по отдельности или суммировать ряды.
+"""
+
+import re
+import threading
+from collections import defaultdict
+
+from django.http import HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+IN_LIST = re.compile(r'\(\s*\?(\s*,\s*\?)*\s*\)')
+SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL без значений: одинаковые по форме запросы совпадают."""
+    sql = STRING.sub('?', sql.replace('%s', '?'))
+    sql = NUMBER.sub('?', sql)
+    sql = IN_LIST.sub('(...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def percentile(values, fraction):
+    """Значение, ниже которого доля fraction наблюдений."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Histogram:
+    """Гистограмма с накопительными корзинами, как в Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+
+class Registry:
+    """Гистограммы времени ответа, числа и времени запросов к базе."""
+
+    METRICS = (
+        (
+            'http_request_duration_seconds',
+            'Время обработки запроса.',
+            DURATION_BUCKETS,
+        ),
+        (
+            'http_request_db_queries',
+            'Число запросов к базе за запрос.',
+            QUERY_BUCKETS,
+        ),
+        (
+            'http_request_db_duration_seconds',
+            'Время запросов к базе за запрос.',
+            DURATION_BUCKETS,
+        ),
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {
+            name: defaultdict(lambda buckets=buckets: Histogram(buckets))
+            for name, _, buckets in self.METRICS
+        }
+        self.responses = defaultdict(int)
+        self.connections = defaultdict(int)
+
+    def observe(self, view, method, status, duration, queries, db_duration):
+        labels = (view, method)
+        with self.lock:
+            self.histograms['http_request_duration_seconds'][labels].observe(
+                duration
+            )
+            self.histograms['http_request_db_queries'][labels].observe(queries)
+            self.histograms['http_request_db_duration_seconds'][
+                labels
+            ].observe(db_duration)
+            self.responses[(view, method, str(status))] += 1
+
+    def count_connection(self, alias, state):
+        """Запрос работал на новом (opened) или старом (reused) соединении."""
+        with self.lock:
+            self.connections[(alias, state)] += 1
+
+    @staticmethod
+    def format_labels(**labels):
+        return ','.join(
+            '{}="{}"'.format(
+                name, str(value).replace('\\', '\\\\').replace('"', '\\"')
+            )
+            for name, value in labels.items()
+        )
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        lines = [
+            '# HELP http_responses_total Число ответов.',
+            '# TYPE http_responses_total counter',
+        ]
+        with self.lock:
+            for (view, method, status), count in sorted(
+                self.responses.items()
+            ):
+                labels = self.format_labels(
+                    view=view, method=method, status=status
+                )
+                lines.append(f'http_responses_total{{{labels}}} {count}')
+            lines.append(
+                '# HELP db_connections_total Соединения с базой по запросам: '
+                'открытые заново и использованные повторно.'
+            )
+            lines.append('# TYPE db_connections_total counter')
+            for (alias, state), count in sorted(self.connections.items()):
+                labels = self.format_labels(alias=alias, state=state)
+                lines.append(f'db_connections_total{{{labels}}} {count}')
+            for name, help_text, _ in self.METRICS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for (view, method), histogram in sorted(
+                    self.histograms[name].items()
+                ):
+                    labels = self.format_labels(view=view, method=method)
+                    for bound, count in zip(
+                        histogram.buckets, histogram.counts
+                    ):
+                        lines.append(
+                            f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                        )
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="+Inf"}} '
+                        f'{histogram.total}'
+                    )
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.total}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def metrics_view(request):
+    """Метрики процесса для Prometheus."""
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,110 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import fingerprint, registry
+
+logger = logging.getLogger('foodgram.slow_requests')
+
+
+class QueryRecorder:
+    """Обёртка выполнения SQL: число, время и сами запросы."""
+
+    def __init__(self):
+        self.queries = []
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.duration += duration
+            self.queries.append((sql, duration))
+
+
+class RequestMetricsMiddleware:
+    """Время ответа и запросы к базе для каждого представления.
+
+    Добавляет заголовок Server-Timing, копит гистограммы для /metrics/
+    и пишет в лог медленные запросы с отпечатками их SQL. Для каждой
+    базы считает, открыл ли запрос новое соединение или взял прежнее.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        opened = {
+            connection.alias: connection.connection
+            for connection in connections.all()
+        }
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        self.count_connections(opened)
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        registry.observe(
+            view,
+            request.method,
+            response.status_code,
+            duration,
+            len(recorder.queries),
+            recorder.duration,
+        )
+        response['Server-Timing'] = (
+            f'app;dur={duration * 1000:.1f}, '
+            f'db;dur={recorder.duration * 1000:.1f};'
+            f'desc="{len(recorder.queries)} queries"'
+        )
+        if duration * 1000 >= settings.SLOW_REQUEST_MS:
+            self.log_slow_request(request, view, duration, recorder)
+        return response
+
+    @staticmethod
+    def count_connections(opened):
+        for connection in connections.all():
+            if connection.connection is None:
+                continue
+            registry.count_connection(
+                connection.alias,
+                (
+                    'reused'
+                    if connection.connection is opened.get(connection.alias)
+                    else 'opened'
+                ),
+            )
+
+    @staticmethod
+    def log_slow_request(request, view, duration, recorder):
+        counts = Counter()
+        durations = Counter()
+        for sql, query_duration in recorder.queries:
+            key = fingerprint(sql)
+            counts[key] += 1
+            durations[key] += query_duration
+        logger.warning(
+            'Медленный запрос %s %s (%s): %.0f мс, SQL: %d за %.0f мс\n%s',
+            request.method,
+            request.get_full_path(),
+            view,
+            duration * 1000,
+            len(recorder.queries),
+            recorder.duration * 1000,
+            '\n'.join(
+                f'  {counts[key]} x {durations[key] * 1000:.1f} мс: {key}'
+                for key, _ in durations.most_common(
+                    settings.SLOW_REQUEST_QUERIES
+                )
+            ),
+        )
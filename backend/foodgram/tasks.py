@@ -0,0 +1,62 @@
+"""Фоновое выполнение долгих задач в потоках процесса."""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .db import check_connections
+
+logger = logging.getLogger(__name__)
+
+
+def create_executor():
+    """Пул фоновых потоков или None, если задачи выполняются сразу.
+
+    SQLite допускает одну пишущую транзакцию на всю базу: задача
+    в соседнем потоке падает с «database table is locked», поэтому
+    на SQLite пул не создаётся.
+    """
+    if (
+        not settings.BACKGROUND_WORKERS
+        or 'sqlite' in settings.DATABASES['default']['ENGINE']
+    ):
+        return None
+    return ThreadPoolExecutor(
+        max_workers=settings.BACKGROUND_WORKERS,
+        thread_name_prefix='background',
+    )
+
+
+executor = create_executor()
+
+
+def run_task(func, args, kwargs):
+    """Выполняет задачу на постоянном соединении своего потока.
+
+    Соединение проверяется при первом SQL-запросе задачи и закрывается
+    после неё по тем же правилам, что и после запроса (CONN_MAX_AGE).
+    """
+    check_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+        raise
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """Ставит задачу в очередь после фиксации текущей транзакции.
+
+    Без фоновых потоков (BACKGROUND_WORKERS=0 или SQLite) задача
+    выполняется сразу после фиксации в том же потоке.
+    """
+    if executor is None:
+        transaction.on_commit(lambda: func(*args, **kwargs))
+        return
+    transaction.on_commit(
+        lambda: executor.submit(run_task, func, args, kwargs)
+    )
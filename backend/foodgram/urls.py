@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from foodgram.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics/', metrics_view, name='metrics'),
 ]
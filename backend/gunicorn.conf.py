@@ -0,0 +1,84 @@
+"""Настройки gunicorn, режим работы выбирается переменной SERVER_MODE.
+
+gthread - WSGI-приложение, в каждом процессе несколько потоков: пока
+один поток ждёт базу, другие обслуживают запросы.
+uvicorn - ASGI-приложение в процессах uvicorn. Синхронные
+представления Django выполняются в одном потоке процесса, поэтому
+процессов нужно не меньше, чем в режиме gthread.
+
+Число процессов по умолчанию считается по ядрам, доступным процессу
+(os.sched_getaffinity учитывает cpuset контейнера), и ограничено
+GUNICORN_MAX_WORKERS: квоту --cpus Docker ядра не показывают.
+
+Бюджет соединений с базой. Каждый поток, обслуживающий запросы, держит
+своё постоянное соединение (DB_CONN_MAX_AGE), и ещё по одному - каждый
+фоновый поток (BACKGROUND_WORKERS):
+    процессы * (потоки + BACKGROUND_WORKERS),
+где потоки - GUNICORN_THREADS в режиме gthread и 1 в режиме uvicorn.
+Сумма по всем экземплярам backend не должна превышать max_connections
+PostgreSQL или размер пула PgBouncer; при запуске она пишется в лог.
+"""
+
+import multiprocessing
+import os
+
+SERVER_MODES = {
+    'gthread': ('foodgram.wsgi:application', 'gthread'),
+    'uvicorn': ('foodgram.asgi:application', 'uvicorn.workers.UvicornWorker'),
+}
+
+server_mode = os.getenv('SERVER_MODE', 'gthread')
+if server_mode not in SERVER_MODES:
+    raise ValueError(
+        f'SERVER_MODE={server_mode}, допустимо: {", ".join(SERVER_MODES)}'
+    )
+wsgi_app, worker_class = SERVER_MODES[server_mode]
+
+
+def available_cpus():
+    """Ядра, на которых процессу разрешено выполняться."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity есть не на всех платформах (macOS).
+        return multiprocessing.cpu_count()
+
+
+cpu_count = available_cpus()
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv(
+        'GUNICORN_WORKERS',
+        min(
+            cpu_count + 1 if server_mode == 'gthread' else cpu_count * 2 + 1,
+            int(os.getenv('GUNICORN_MAX_WORKERS', 8)),
+        ),
+    )
+)
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Дольше, чем keepalive_timeout upstream в nginx.conf: соединение
+# закрывает nginx, а не gunicorn посреди отправки следующего запроса.
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 75))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = timeout
+
+# Перезапуск процесса после max_requests запросов ограничивает рост
+# памяти, но обрывает его постоянные соединения; 0 - не перезапускать.
+# Разброс не даёт всем процессам уйти одновременно.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    """Пишет в лог бюджет соединений с базой одного экземпляра."""
+    request_threads = threads if server_mode == 'gthread' else 1
+    background_threads = int(os.getenv('BACKGROUND_WORKERS', 2))
+    server.log.info(
+        'Соединений с базой до %s: %s процессов * (%s потоков запросов '
+        '+ %s фоновых)',
+        workers * (request_threads + background_threads),
+        workers,
+        request_threads,
+        background_threads,
+    )
@@ -1,14 +1,17 @@
-import csv
-
 from django.contrib import admin, messages
 from django.contrib.auth.models import Group
+from django.db import transaction
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
 from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 from rest_framework.authtoken.models import TokenProxy
 
+from foodgram.tasks import run_in_background
+
+from . import shopping_list
 from .forms import IngredientImportForm, RecipeAdminForm
+from .importers import ImportFormatError, import_file
 from .models import (
     Favorite,
     ImportIngredient,
@@ -34,6 +37,13 @@ class TagAdmin(admin.ModelAdmin):
 @admin.register(ImportIngredient)
 class ImportIngredient(admin.ModelAdmin):
     list_display = ('csv_file', 'date_added')
+    actions = ('import_in_background',)
+
+    @admin.action(description='Импортировать файлы в фоне')
+    def import_in_background(self, request, queryset):
+        for import_object in queryset:
+            run_in_background(import_file, import_object.csv_file.path)
+        messages.success(request, 'Импорт запущен в фоне')
 
 
 @admin.register(Ingredient)
@@ -54,22 +64,20 @@ class IngredientAdmin(admin.ModelAdmin):
             form = IngredientImportForm(request.POST, request.FILES)
             if form.is_valid():
                 form_object = form.save()
-                with open(
-                    form_object.csv_file.path, encoding='utf-8'
-                ) as csv_file:
-                    rows = csv.reader(csv_file, delimiter=',')
-                    if next(rows) != ['name', 'measurement_unit']:
-                        messages.warning(request, 'Неверные заголовки у файла')
-                        return HttpResponseRedirect(request.path_info)
-                    Ingredient.objects.bulk_create(
-                        Ingredient(
-                            name=row[0],
-                            measurement_unit=row[1],
-                        )
-                        for row in rows
-                    )
+                path = form_object.csv_file.path
+                if form.cleaned_data['in_background']:
+                    run_in_background(import_file, path)
+                    messages.success(request, 'Импорт запущен в фоне')
+                    return HttpResponseRedirect(reverse('admin:index'))
+                try:
+                    stats = import_file(path)
+                except ImportFormatError as error:
+                    messages.warning(request, str(error))
+                    return HttpResponseRedirect(request.path_info)
                 url = reverse('admin:index')
-                messages.success(request, 'Файл успешно импортирован')
+                messages.success(
+                    request, f'Файл успешно импортирован: {stats}'
+                )
                 return HttpResponseRedirect(url)
         form = IngredientImportForm()
         return render(request, 'admin/csv_import_page.html', {'form': form})
@@ -100,13 +108,20 @@ class RecipeAdmin(admin.ModelAdmin):
     empty_value_display = '- пусто -'
     filter_horizontal = ("tags",)
 
+    def save_related(self, request, form, formsets, change):
+        """Правки ингредиентов в inline доходят до списков покупок."""
+        with shopping_list.tracking((form.instance.pk,)):
+            super().save_related(request, form, formsets, change)
+
     @admin.display(description='Изображение')
     def get_image(self, obj):
-        return mark_safe(f'<img src={obj.image.url} width="80" hieght="30"')
+        return mark_safe(
+            f'<img src={obj.get_thumbnails()["admin"]} width="80" hieght="30"'
+        )
 
-    @admin.display(description='В избранном')
+    @admin.display(description='В избранном', ordering='favorites_count')
     def in_favorites(self, obj):
-        return obj.favorite.count()
+        return obj.favorites_count
 
     @admin.display(description='Ингредиенты')
     def get_ingredients(self, obj):
@@ -123,9 +138,32 @@ class RecipeAdmin(admin.ModelAdmin):
 
 @admin.register(RecipeIngredient)
 class RecipeIngredientAdmin(admin.ModelAdmin):
+    """Строки ингредиентов; правки переносятся в списки покупок."""
+
     list_display = ('pk', 'recipe', 'ingredient', 'amount')
     list_editable = ('recipe', 'ingredient', 'amount')
 
+    def save_model(self, request, obj, form, change):
+        recipe_ids = {obj.recipe_id}
+        if change:
+            recipe_ids.update(
+                RecipeIngredient.objects.filter(pk=obj.pk).values_list(
+                    'recipe_id', flat=True
+                )
+            )
+        with shopping_list.tracking(recipe_ids):
+            super().save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        with shopping_list.tracking((obj.recipe_id,)):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with shopping_list.tracking(
+            queryset.values_list('recipe_id', flat=True)
+        ):
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
@@ -138,6 +176,18 @@ class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('pk', 'user', 'recipe')
     list_editable = ('user', 'recipe')
 
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        """Смена пользователя или рецепта переносит ингредиенты
+        между списками покупок.
+        """
+        if not change:
+            return super().save_model(request, obj, form, change)
+        old = ShoppingСart.objects.select_for_update().get(pk=obj.pk)
+        shopping_list.remove_recipe(old.user_id, old.recipe_id)
+        super().save_model(request, obj, form, change)
+        shopping_list.add_recipe(obj.user_id, obj.recipe_id)
+
 
 admin.site.unregister(Group)
 admin.site.unregister(TokenProxy)
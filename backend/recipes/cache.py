@@ -0,0 +1,174 @@
+"""Версии справочников и рецептов в кеше.
+
+Версия - момент последнего изменения данных. Она входит в ключи
+закешированных ответов, поэтому изменение данных делает старые ключи
+недостижимыми без перебора и удаления.
+
+С локальным кешем каждый процесс видит только свои версии, поэтому
+у них есть срок жизни CACHE_VERSION_TIMEOUT: после него процесс берёт
+новую версию и перечитывает данные. Без DEBUG об этом предупреждает
+проверка foodgram.W002: для нескольких процессов нужен общий кеш.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.checks import Warning, register
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_NOT_BUILT = object()
+
+
+def get_version(name):
+    """Текущая версия набора данных.
+
+    Если кеш ничего не хранит (DummyCache), версия каждый раз новая:
+    данные считаются изменившимися.
+    """
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        version = time.time()
+        cache.add(key, version, settings.CACHE_VERSION_TIMEOUT)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(name):
+    """Новая версия набора данных после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: cache.set(
+            f'version:{name}', time.time(), settings.CACHE_VERSION_TIMEOUT
+        )
+    )
+
+
+def get_many_with_versions(keys, names):
+    """Значения по ключам и текущие версии наборов данных.
+
+    Значения и существующие версии читаются из кеша одним запросом.
+    Возвращает ({key: value} для найденных ключей, {name: version}).
+    """
+    version_keys = {name: f'version:{name}' for name in names}
+    found = cache.get_many([*keys, *version_keys.values()])
+    versions = {
+        name: found[key] if key in found else get_version(name)
+        for name, key in version_keys.items()
+    }
+    return {key: found[key] for key in keys if key in found}, versions
+
+
+def get_versions(names):
+    """Текущие версии нескольких наборов данных: {name: version}."""
+    return get_many_with_versions((), names)[1]
+
+
+class LocalIndex:
+    """Индекс в памяти процесса, пересобираемый при смене версии данных.
+
+    build - функция без аргументов, строящая индекс по базе. Первый
+    индекс строится в запросе под блокировкой: потоки процесса не строят
+    его одновременно, а дожидаются готового. После смены версии запросы
+    получают прежний индекс, пока новый строится в отдельном потоке.
+    Версия и индекс хранятся одной парой, поэтому поток не увидит новую
+    версию со старым индексом.
+    """
+
+    def __init__(self, version_name, build):
+        self.version_name = version_name
+        self.build = build
+        self.lock = threading.Lock()
+        self.current = (_NOT_BUILT, None)
+        self.rebuilding = None
+
+    def get(self, version=None):
+        """Индекс для версии, по умолчанию - текущей.
+
+        Пока новый индекс строится, возвращается прежний.
+        """
+        return self.lookup(version)[0]
+
+    def lookup(self, version=None):
+        """Индекс и признак того, что он построен для этой версии.
+
+        Результаты по прежнему индексу нельзя кешировать под новой
+        версией: иначе они переживут пересборку.
+        """
+        if version is None:
+            version = get_version(self.version_name)
+        built_version, index = self.current
+        if built_version is _NOT_BUILT:
+            with self.lock:
+                built_version, index = self.current
+                if built_version is _NOT_BUILT:
+                    built_version, index = version, self.build()
+                    self.current = (version, index)
+        elif built_version != version:
+            self.rebuild_in_background(version)
+        return index, built_version == version
+
+    def rebuild_in_background(self, version):
+        """Запускает сборку индекса для версии, если она ещё не идёт."""
+        with self.lock:
+            if self.rebuilding is not None and self.rebuilding.is_alive():
+                return
+            self.rebuilding = threading.Thread(
+                target=self.rebuild_in_thread,
+                args=(version,),
+                name=f'index-{self.version_name}',
+                daemon=True,
+            )
+            self.rebuilding.start()
+
+    def rebuild(self, version):
+        """Строит индекс и подменяет им прежний.
+
+        При ошибке остаётся прежний индекс, следующий запрос повторит
+        сборку.
+        """
+        try:
+            self.current = (version, self.build())
+        except Exception:
+            logger.exception('Индекс %s не собран', self.version_name)
+
+    def rebuild_in_thread(self, version):
+        """Сборка в отдельном потоке со своими соединениями с базой."""
+        try:
+            self.rebuild(version)
+        finally:
+            connections.close_all()
+
+    def clear(self):
+        """Забывает индекс: следующий запрос построит его заново."""
+        with self.lock:
+            self.current = (_NOT_BUILT, None)
+
+
+def recipe_pages_changed(recipe_ids=()):
+    """Новые версии списков рецептов и карточек изменённых рецептов."""
+    bump_version('recipe_pages')
+    for recipe_id in recipe_ids:
+        bump_version(f'recipe:{recipe_id}')
+
+
+@register()
+def check_cache_settings(app_configs, **kwargs):
+    """Предупреждает о локальном кеше вне разработки."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or not backend.endswith('LocMemCache'):
+        return []
+    return [
+        Warning(
+            'Локальный кеш: изменения из других процессов видны только '
+            'через CACHE_VERSION_TIMEOUT.',
+            hint='Задайте общий CACHE_BACKEND, например '
+            'django.core.cache.backends.memcached.PyMemcacheCache '
+            'или django.core.cache.backends.db.DatabaseCache.',
+            id='foodgram.W002',
+        )
+    ]
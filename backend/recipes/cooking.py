@@ -0,0 +1,60 @@
+"""Подбор рецептов по имеющимся ингредиентам.
+
+Обратный индекс «ингредиент -> рецепты» хранится в памяти процесса
+и после изменения рецептов пересобирается в фоне (см. LocalIndex).
+Для набора ингредиентов совпадения считаются проходом по их спискам,
+без запросов к базе для каждого рецепта.
+"""
+
+from array import array
+from collections import Counter, defaultdict
+
+from foodgram.constants import COOKING_INDEX_CHUNK_SIZE
+
+from .cache import LocalIndex
+from .models import RecipeIngredient
+
+
+class CookingIndex:
+    """Рецепты каждого ингредиента и число ингредиентов рецепта."""
+
+    def __init__(self, rows):
+        postings = defaultdict(list)
+        self.totals = Counter()
+        for recipe_id, ingredient_id in rows:
+            postings[ingredient_id].append(recipe_id)
+            self.totals[recipe_id] += 1
+        self.postings = {
+            ingredient_id: array('q', recipe_ids)
+            for ingredient_id, recipe_ids in postings.items()
+        }
+
+    @classmethod
+    def load(cls):
+        """Индекс по составу рецептов из базы."""
+        return cls(
+            RecipeIngredient.objects.order_by()
+            .values_list('recipe_id', 'ingredient_id')
+            .iterator(chunk_size=COOKING_INDEX_CHUNK_SIZE)
+        )
+
+    def rank(self, ingredient_ids):
+        """Рецепты с хотя бы одним ингредиентом из набора.
+
+        Возвращает [(recipe_id, есть, всего)]: сначала рецепты с большей
+        долей имеющихся ингредиентов, затем с меньшим числом недостающих,
+        затем более новые.
+        """
+        matched = Counter()
+        for ingredient_id in set(ingredient_ids):
+            matched.update(self.postings.get(ingredient_id, ()))
+        return sorted(
+            (
+                (recipe_id, count, self.totals[recipe_id])
+                for recipe_id, count in matched.items()
+            ),
+            key=lambda row: (-row[1] / row[2], row[2] - row[1], -row[0]),
+        )
+
+
+cooking_index = LocalIndex('recipes', CookingIndex.load)
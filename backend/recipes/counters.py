@@ -0,0 +1,77 @@
+"""Счётчики избранного, корзин, рецептов и подписчиков.
+
+Счётчик хранится в колонке модели и меняется на единицу через F()
+при создании и удалении связанной записи. Массовые операции сигналов
+не вызывают, поэтому после них счётчики сверяются командой
+reconcile_counters.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from users.models import Subscribed, User
+
+from .models import Favorite, Recipe, ShoppingСart
+
+
+class Counter:
+    """Колонка field модели model - число записей related по полю fk."""
+
+    def __init__(self, model, field, related, fk):
+        self.model = model
+        self.field = field
+        self.related = related
+        self.fk = fk
+
+    def __str__(self):
+        return f'{self.model.__name__}.{self.field}'
+
+    def change(self, pk, delta):
+        self.model.objects.filter(pk=pk).update(
+            **{self.field: Greatest(F(self.field) + delta, 0)}
+        )
+
+    def added(self, sender, instance, created, **kwargs):
+        if created:
+            self.change(getattr(instance, f'{self.fk}_id'), 1)
+
+    def removed(self, sender, instance, **kwargs):
+        self.change(getattr(instance, f'{self.fk}_id'), -1)
+
+    def actual(self):
+        """Выражение с настоящим числом связанных записей."""
+        return Coalesce(
+            Subquery(
+                self.related.objects.filter(**{self.fk: OuterRef('pk')})
+                .order_by()
+                .values(self.fk)
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+
+    def mismatched(self):
+        """id объектов, у которых счётчик разошёлся с данными."""
+        return list(
+            self.model.objects.annotate(actual=self.actual())
+            .exclude(**{self.field: F('actual')})
+            .values_list('pk', flat=True)
+        )
+
+    def reconcile(self):
+        """Пересчитывает разошедшиеся счётчики; возвращает их число."""
+        pks = self.mismatched()
+        if pks:
+            self.model.objects.filter(pk__in=pks).update(
+                **{self.field: self.actual()}
+            )
+        return len(pks)
+
+
+COUNTERS = (
+    Counter(Recipe, 'favorites_count', Favorite, 'recipe'),
+    Counter(Recipe, 'in_carts_count', ShoppingСart, 'recipe'),
+    Counter(User, 'recipes_count', Recipe, 'author'),
+    Counter(User, 'subscribers_count', Subscribed, 'author'),
+)
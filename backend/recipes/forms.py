@@ -1,4 +1,5 @@
 from django.forms import (
+    BooleanField,
     CheckboxSelectMultiple,
     ModelForm,
     ModelMultipleChoiceField,
@@ -10,6 +11,8 @@ from .models import ImportIngredient, Recipe, Tag
 class IngredientImportForm(ModelForm):
     """Форма добавления ингридиентов при импорте."""
 
+    in_background = BooleanField(label='Импортировать в фоне', required=False)
+
     class Meta:
         model = ImportIngredient
         fields = ('csv_file',)
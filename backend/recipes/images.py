@@ -0,0 +1,95 @@
+"""Миниатюры изображений рецептов."""
+
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from foodgram.constants import (
+    THUMBNAIL_FORMAT,
+    THUMBNAIL_PATH,
+    THUMBNAIL_QUALITY,
+    THUMBNAIL_SIZES,
+)
+
+from .cache import recipe_pages_changed
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+
+def get_thumbnail_name(image_name, variant):
+    """Имя файла миниатюры: по имени исходника и варианта."""
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f'{THUMBNAIL_PATH}{stem}_{variant}.{THUMBNAIL_FORMAT.lower()}'
+
+
+def open_image(image_file):
+    """Читает изображение с учётом поворота из EXIF."""
+    with image_file.open('rb'):
+        image = Image.open(image_file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    return image
+
+
+def render_thumbnail(image, size):
+    """Уменьшенная копия изображения в формате миниатюр."""
+    thumbnail = image.copy()
+    thumbnail.thumbnail(size, Image.LANCZOS)
+    buffer = BytesIO()
+    thumbnail.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+def delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+def generate_thumbnails(recipe_id):
+    """Создаёт миниатюры рецепта и сохраняет их имена в рецепте.
+
+    Если за время работы изображение рецепта сменилось, созданные
+    файлы удаляются: миниатюры для нового изображения сделает
+    следующая задача.
+    """
+    recipe = (
+        Recipe.objects.filter(pk=recipe_id).only('image', 'thumbnails').first()
+    )
+    if recipe is None or not recipe.image:
+        return None
+    image_name = recipe.image.name
+    storage = recipe.image.storage
+    try:
+        image = open_image(recipe.image)
+    except OSError:
+        logger.warning('Не удалось прочитать изображение %s', image_name)
+        return None
+    thumbnails = {'source': image_name}
+    for variant, size in THUMBNAIL_SIZES.items():
+        name = get_thumbnail_name(image_name, variant)
+        storage.delete(name)
+        thumbnails[variant] = storage.save(
+            name, ContentFile(render_thumbnail(image, size))
+        )
+    created = [thumbnails[variant] for variant in THUMBNAIL_SIZES]
+    if not Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+        thumbnails=thumbnails
+    ):
+        delete_files(storage, created)
+        return None
+    recipe_pages_changed((recipe_id,))
+    delete_files(
+        storage,
+        (
+            name
+            for variant, name in recipe.thumbnails.items()
+            if variant != 'source' and name not in created
+        ),
+    )
+    return thumbnails
@@ -0,0 +1,176 @@
+"""Потоковый импорт ингредиентов из CSV и JSON."""
+
+import csv
+import json
+import logging
+import re
+import time
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from foodgram.constants import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_HEADER_ERROR,
+    IMPORT_JSON_ERROR,
+    IMPORT_MAX_ITEM_SIZE,
+    IMPORT_READ_SIZE,
+)
+
+from .cache import bump_version
+from .models import Ingredient
+
+logger = logging.getLogger(__name__)
+
+SEPARATORS = re.compile(r'[\s,]*')
+
+
+class ImportFormatError(ValueError):
+    """Файл не похож на список ингредиентов."""
+
+
+class ImportStats:
+    """Счётчики импорта."""
+
+    def __init__(self):
+        self.created = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    @property
+    def processed(self):
+        return self.created + self.skipped
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed else 0
+
+    def __str__(self):
+        return (
+            f'обработано {self.processed}, создано {self.created}, '
+            f'пропущено дубликатов {self.skipped}, '
+            f'{self.rows_per_second:.0f} строк/с'
+        )
+
+
+def read_csv(file):
+    """Строки (название, единица) из CSV с заголовком."""
+    rows = csv.reader(file, delimiter=',')
+    if next(rows, None) != ['name', 'measurement_unit']:
+        raise ImportFormatError(IMPORT_HEADER_ERROR)
+    for row in rows:
+        if len(row) >= 2:
+            yield row[0], row[1]
+
+
+def read_json(file):
+    """Строки (название, единица) из JSON-массива объектов.
+
+    Файл читается блоками, объекты разбираются по мере поступления.
+    Неразобранный остаток не длиннее IMPORT_MAX_ITEM_SIZE: мусор между
+    объектами, повреждённый объект и файл, оборванный до «]», дают
+    ImportFormatError, а не молча импортированное начало.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    offset = 0
+    opened = False
+    for chunk in iter(partial(file.read, IMPORT_READ_SIZE), ''):
+        buffer += chunk
+        position = 0
+        while True:
+            position = SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                break
+            if not opened:
+                if buffer[position] != '[':
+                    raise ImportFormatError(IMPORT_HEADER_ERROR)
+                opened = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            if buffer[position] != '{':
+                raise ImportFormatError(
+                    IMPORT_JSON_ERROR.format(offset + position)
+                )
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                if len(buffer) - position > IMPORT_MAX_ITEM_SIZE:
+                    raise ImportFormatError(
+                        IMPORT_JSON_ERROR.format(offset + position)
+                    )
+                break
+            try:
+                yield item['name'], item['measurement_unit']
+            except (KeyError, TypeError):
+                raise ImportFormatError(IMPORT_HEADER_ERROR)
+        buffer = buffer[position:]
+        offset += position
+    if not opened:
+        raise ImportFormatError(IMPORT_HEADER_ERROR)
+    raise ImportFormatError(IMPORT_JSON_ERROR.format(offset))
+
+
+READERS = {
+    'csv': read_csv,
+    'json': read_json,
+}
+
+
+def get_format(path):
+    """Формат файла по расширению."""
+    file_format = Path(path).suffix.lstrip('.').lower()
+    if file_format not in READERS:
+        raise ImportFormatError(IMPORT_HEADER_ERROR)
+    return file_format
+
+
+def import_rows(rows, batch_size=IMPORT_BATCH_SIZE, progress=None):
+    """Сохраняет ингредиенты пачками, пропуская уже существующие.
+
+    Дубликаты внутри пачки и уже лежащие в базе строки не вставляются,
+    а ignore_conflicts страхует от параллельного импорта тех же строк.
+    """
+    stats = ImportStats()
+    rows = iter(rows)
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            unique = dict.fromkeys(
+                (name.strip(), unit.strip()) for name, unit in batch
+            )
+            existing = set(
+                Ingredient.objects.filter(
+                    name__in={name for name, _ in unique}
+                ).values_list('name', 'measurement_unit')
+            )
+            new = [
+                Ingredient(name=name, measurement_unit=unit)
+                for name, unit in unique
+                if (name, unit) not in existing
+            ]
+            Ingredient.objects.bulk_create(new, ignore_conflicts=True)
+            stats.created += len(new)
+            stats.skipped += len(batch) - len(new)
+            if progress:
+                progress(stats)
+    finally:
+        if stats.created:
+            bump_version('ingredients')
+    return stats
+
+
+def import_file(
+    path, file_format=None, batch_size=IMPORT_BATCH_SIZE, progress=None
+):
+    """Импортирует ингредиенты из файла CSV или JSON."""
+    file_format = file_format or get_format(path)
+    with open(path, encoding='utf-8') as file:
+        stats = import_rows(READERS[file_format](file), batch_size, progress)
+    logger.info('Импорт ингредиентов из %s: %s', path, stats)
+    return stats
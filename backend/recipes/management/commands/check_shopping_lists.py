@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes import shopping_list
+
+
+class Command(BaseCommand):
+    help = 'Сверяет сводные списки покупок с корзинами пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Пересобрать списки пользователей с расхождениями.',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = shopping_list.find_mismatches()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        ids = ', '.join(map(str, mismatches))
+        if not options['fix']:
+            raise CommandError(f'Расхождения у пользователей: {ids}')
+        shopping_list.rebuild(mismatches)
+        self.stdout.write(
+            self.style.SUCCESS(f'Списки пользователей пересобраны: {ids}')
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import generate_thumbnails
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт миниатюры изображений рецептов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            dest='regenerate',
+            help='Пересоздать миниатюры и для рецептов, где они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='').only('image', 'thumbnails')
+        generated = 0
+        for recipe in recipes.iterator():
+            if options['regenerate'] or not recipe.thumbnails_ready:
+                generated += generate_thumbnails(recipe.pk) is not None
+        self.stdout.write(
+            self.style.SUCCESS(f'Миниатюры созданы для рецептов: {generated}')
+        )
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.constants import IMPORT_BATCH_SIZE
+from recipes.importers import READERS, ImportFormatError, import_file
+
+
+class Command(BaseCommand):
+    help = 'Импортирует ингредиенты из CSV или JSON пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу, например data/ingredients.csv'
+        )
+        parser.add_argument(
+            '--format',
+            choices=READERS,
+            dest='file_format',
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Количество строк в одной вставке.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = import_file(
+                options['path'],
+                options['file_format'],
+                options['batch_size'],
+                progress=lambda stats: self.stdout.write(str(stats)),
+            )
+        except (ImportFormatError, OSError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(f'Импорт завершён: {stats}'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from recipes import shopping_list
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает сводные списки покупок по корзинам пользователей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            nargs='+',
+            dest='user_ids',
+            help='id пользователей; по умолчанию пересобираются все списки.',
+        )
+
+    def handle(self, *args, **options):
+        created = shopping_list.rebuild(options['user_ids'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Списки покупок пересобраны, строк: {created}')
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes.counters import COUNTERS
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики избранного, корзин, рецептов и подписчиков '
+        'с данными и исправляет расхождения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только показать расхождения, ничего не меняя.',
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = [
+                f'{counter}: {count}'
+                for counter, count in (
+                    (counter, len(counter.mismatched()))
+                    for counter in COUNTERS
+                )
+                if count
+            ]
+            if mismatches:
+                raise CommandError(
+                    'Расхождения счётчиков: ' + ', '.join(mismatches)
+                )
+            self.stdout.write(self.style.SUCCESS('Расхождений нет.'))
+            return
+        for counter in COUNTERS:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'{counter}: исправлено {counter.reconcile()}'
+                )
+            )
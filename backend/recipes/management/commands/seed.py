@@ -0,0 +1,100 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from foodgram.constants import SEED_BATCH_SIZE
+from recipes.synthetic import Dataset, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, рецепты, избранное, корзины '
+        'и подписки для нагрузочного тестирования. Ингредиенты должны '
+        'быть загружены заранее командой import_ingredients.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients-per-recipe',
+            type=int,
+            nargs=2,
+            default=(3, 10),
+            metavar=('MIN', 'MAX'),
+        )
+        parser.add_argument(
+            '--favorites',
+            type=int,
+            default=10,
+            help='Среднее число избранных рецептов на пользователя.',
+        )
+        parser.add_argument(
+            '--carts',
+            type=int,
+            default=3,
+            help='Среднее число рецептов в корзине на пользователя.',
+        )
+        parser.add_argument(
+            '--subscriptions',
+            type=int,
+            default=5,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--images',
+            type=int,
+            default=8,
+            help='Сколько разных заглушек изображений создать.',
+        )
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.0,
+            help='Показатель степенного закона популярности, 0 - равномерно.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help=(
+                'Префикс имён пользователей и названий рецептов; ни одно '
+                'существующее имя не должно с него начинаться.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=SEED_BATCH_SIZE,
+            help='Количество строк в одной вставке.',
+        )
+
+    def handle(self, *args, **options):
+        dataset = Dataset(
+            users=options['users'],
+            recipes=options['recipes'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            favorites_per_user=options['favorites'],
+            carts_per_user=options['carts'],
+            subscriptions_per_user=options['subscriptions'],
+            images=options['images'],
+            skew=options['skew'],
+        )
+        started = time.perf_counter()
+        try:
+            seed(
+                dataset,
+                seed=options['seed'],
+                prefix=options['prefix'],
+                batch_size=options['batch_size'],
+                progress=lambda message: self.stdout.write(
+                    f'{time.perf_counter() - started:8.1f} с  {message}'
+                ),
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Данные созданы за {time.perf_counter() - started:.1f} с'
+            )
+        )
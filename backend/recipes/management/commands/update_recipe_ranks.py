@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recipes import ranking
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги рецептов для сортировок popular и trending. '
+        'Запускается периодически, например из cron.'
+    )
+
+    def handle(self, *args, **options):
+        created = ranking.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рейтинги пересчитаны, рецептов: {created}')
+        )
@@ -0,0 +1,53 @@
+# Generated by Django 3.2.20 on 2026-10-18 12:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+COUNTERS = (
+    ('recipes', 'Recipe', 'favorites_count', 'recipes', 'Favorite', 'recipe'),
+    ('recipes', 'Recipe', 'in_carts_count', 'recipes', 'ShoppingСart', 'recipe'),
+    ('users', 'User', 'recipes_count', 'recipes', 'Recipe', 'author'),
+    ('users', 'User', 'subscribers_count', 'users', 'Subscribed', 'author'),
+)
+
+
+def fill_counters(apps, schema_editor):
+    for app, model, field, related_app, related, fk in COUNTERS:
+        related_model = apps.get_model(related_app, related)
+        apps.get_model(app, model).objects.update(
+            **{
+                field: Coalesce(
+                    Subquery(
+                        related_model.objects.filter(**{fk: OuterRef('pk')})
+                        .order_by()
+                        .values(fk)
+                        .annotate(total=Count('pk'))
+                        .values('total')
+                    ),
+                    0,
+                )
+            }
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_recipe_tags_tag_recipe_index'),
+        ('users', '0002_user_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В избранном'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_carts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='В корзинах'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
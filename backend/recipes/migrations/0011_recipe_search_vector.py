@@ -0,0 +1,55 @@
+# Generated by Django 3.2.20 on 2026-10-18 12:31
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce({0}name, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce({0}text, '')), 'B')"
+)
+CREATE_SEARCH = (
+    'CREATE OR REPLACE FUNCTION recipes_recipe_search_vector_update() '
+    'RETURNS trigger AS $$ BEGIN '
+    f'NEW.search_vector := {SEARCH_VECTOR.format("NEW.")}; '
+    'RETURN NEW; END $$ LANGUAGE plpgsql',
+    'CREATE TRIGGER recipes_recipe_search_vector '
+    'BEFORE INSERT OR UPDATE ON recipes_recipe FOR EACH ROW '
+    'EXECUTE PROCEDURE recipes_recipe_search_vector_update()',
+    f'UPDATE recipes_recipe SET search_vector = {SEARCH_VECTOR.format("")}',
+    'CREATE INDEX IF NOT EXISTS recipes_recipe_search_vector_gin '
+    'ON recipes_recipe USING gin (search_vector)',
+)
+DROP_SEARCH = (
+    'DROP INDEX IF EXISTS recipes_recipe_search_vector_gin',
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector ON recipes_recipe',
+    'DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update()',
+)
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_recipe_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.RunPython(
+            run_on_postgresql(CREATE_SEARCH),
+            run_on_postgresql(DROP_SEARCH),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+DROP_TRIGGER = (
+    'DROP TRIGGER IF EXISTS recipes_recipe_search_vector ON recipes_recipe'
+)
+# Вектор зависит только от названия и описания: обновления счётчиков
+# избранного и корзин не должны пересчитывать его на каждой строке.
+UPDATE_OF_TEXT = (
+    DROP_TRIGGER,
+    'CREATE TRIGGER recipes_recipe_search_vector '
+    'BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe '
+    'FOR EACH ROW EXECUTE PROCEDURE recipes_recipe_search_vector_update()',
+)
+UPDATE_OF_ANY = (
+    DROP_TRIGGER,
+    'CREATE TRIGGER recipes_recipe_search_vector '
+    'BEFORE INSERT OR UPDATE ON recipes_recipe FOR EACH ROW '
+    'EXECUTE PROCEDURE recipes_recipe_search_vector_update()',
+)
+
+
+def run_on_postgresql(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgresql(UPDATE_OF_TEXT),
+            run_on_postgresql(UPDATE_OF_ANY),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.2.20 on 2026-10-18 13:39
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def create_missing_ranks(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    RecipeRank = apps.get_model('recipes', 'RecipeRank')
+    RecipeRank.objects.bulk_create(
+        (
+            RecipeRank(recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                rank__isnull=True
+            ).values_list('id', flat=True)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_recipe_search_vector_trigger_columns'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reciperank',
+            name='popular',
+            field=models.FloatField(default=0, verbose_name='Популярность'),
+        ),
+        migrations.AlterField(
+            model_name='reciperank',
+            name='trending',
+            field=models.FloatField(default=0, verbose_name='В тренде'),
+        ),
+        migrations.AddIndex(
+            model_name='reciperank',
+            index=models.Index(fields=['-popular', '-recipe'], name='recipe_rank_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reciperank',
+            index=models.Index(fields=['-trending', '-recipe'], name='recipe_rank_trending_idx'),
+        ),
+        migrations.RunPython(create_missing_ranks, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from colorfield.fields import ColorField
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
@@ -19,8 +20,9 @@ from foodgram.constants import (
     NAME_ERROR,
     NAME_INGRIDENT_RERROR,
     SLUG_ERROR,
+    THUMBNAIL_SIZES,
 )
-from users.models import User
+from users.models import CountersMixin, User
 
 
 class Tag(models.Model):
@@ -100,7 +102,7 @@ class ImportIngredient(models.Model):
     date_added = models.DateTimeField(auto_now_add=True)
 
 
-class Recipe(models.Model):
+class Recipe(CountersMixin, models.Model):
     """Модель рецептов."""
 
     ingredients = models.ManyToManyField(
@@ -141,15 +143,56 @@ class Recipe(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации'
     )
+    thumbnails = models.JSONField(
+        'Миниатюры изображения',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        'Поисковый вектор', null=True, editable=False
+    )
+    favorites_count = models.PositiveIntegerField(
+        'В избранном', default=0, editable=False
+    )
+    in_carts_count = models.PositiveIntegerField(
+        'В корзинах', default=0, editable=False
+    )
+
+    counter_fields = ('favorites_count', 'in_carts_count')
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'id'], name='recipe_pub_date_id_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def thumbnails_ready(self):
+        """Миниатюры сделаны из текущего изображения."""
+        return bool(self.image) and (
+            self.thumbnails.get('source') == self.image.name
+        )
+
+    def get_thumbnails(self):
+        """Ссылки на миниатюры по вариантам.
+
+        Пока миниатюры не готовы, отдаётся исходное изображение.
+        """
+        if not self.thumbnails_ready:
+            return {variant: self.image.url for variant in THUMBNAIL_SIZES}
+        return {
+            variant: self.image.storage.url(self.thumbnails[variant])
+            for variant in THUMBNAIL_SIZES
+        }
+
 
 class RecipeIngredient(models.Model):
     """Модель связывает Recipe и Ingredient с
@@ -200,6 +243,7 @@ class UserRelation(models.Model):
     recipe = models.ForeignKey(
         Recipe, on_delete=models.CASCADE, verbose_name='Рецепт'
     )
+    created = models.DateTimeField('Добавлено', auto_now_add=True)
 
     class Meta:
         ordering = ('id',)
@@ -232,3 +276,76 @@ class ShoppingСart(UserRelation):
         default_related_name = 'shoppingcart'
         verbose_name = 'Корзина'
         verbose_name_plural = 'Корзина'
+
+
+class RecipeRank(models.Model):
+    """Рейтинги рецептов для сортировки ленты.
+
+    Строка есть у каждого рецепта, поэтому лента по рейтингу читается
+    из этой таблицы по составному индексу, а рецепты страницы
+    загружаются по id. Пересчитываются периодически командой
+    update_recipe_ranks.
+    """
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+        verbose_name='Рецепт',
+    )
+    popular = models.FloatField('Популярность', default=0)
+    trending = models.FloatField('В тренде', default=0)
+    updated = models.DateTimeField('Пересчитано', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+        indexes = [
+            models.Index(
+                fields=['-popular', '-recipe'], name='recipe_rank_popular_idx'
+            ),
+            models.Index(
+                fields=['-trending', '-recipe'],
+                name='recipe_rank_trending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.popular:.1f} / {self.trending:.1f}'
+
+
+class ShoppingListIngredient(models.Model):
+    """Сводный список покупок пользователя.
+
+    Хранит суммарное количество каждого ингредиента по всем рецептам
+    корзины и обновляется при изменении корзины и рецептов в ней.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='shopping_list',
+        verbose_name='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='shopping_lists',
+        verbose_name='Ингредиент',
+    )
+    amount = models.IntegerField('Количество', default=0)
+
+    class Meta:
+        ordering = ('user', 'ingredient')
+        verbose_name = 'Ингредиент в списке покупок'
+        verbose_name_plural = 'Списки покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name='unique_shopping_list_ingredient',
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.ingredient}: {self.amount}'
@@ -0,0 +1,118 @@
+"""Рейтинги рецептов: популярные и в тренде.
+
+Популярность - избранное и корзины за всё время по счётчикам рецепта.
+Тренд - те же действия за последние TRENDING_WINDOW_DAYS дней, вес
+каждого действия убывает вдвое каждые TRENDING_HALF_LIFE_DAYS дней.
+
+Лента по рейтингу читается из RecipeRank по составным индексам
+(рейтинг, recipe_id), см. ranked_recipes.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from foodgram.constants import (
+    RANK_BATCH_SIZE,
+    RANK_CART_WEIGHT,
+    RANK_FAVORITE_WEIGHT,
+    TRENDING_HALF_LIFE_DAYS,
+    TRENDING_WINDOW_DAYS,
+)
+
+from .cache import bump_version
+from .models import Favorite, Recipe, RecipeRank, ShoppingСart
+
+ACTIVITY_WEIGHTS = (
+    (Favorite, RANK_FAVORITE_WEIGHT),
+    (ShoppingСart, RANK_CART_WEIGHT),
+)
+
+
+def popular_scores():
+    """{recipe_id: популярность} для рецептов с активностью."""
+    return {
+        recipe_id: (
+            favorites * RANK_FAVORITE_WEIGHT + in_carts * RANK_CART_WEIGHT
+        )
+        for recipe_id, favorites, in_carts in Recipe.objects.filter(
+            Q(favorites_count__gt=0) | Q(in_carts_count__gt=0)
+        ).values_list('id', 'favorites_count', 'in_carts_count')
+    }
+
+
+def trending_scores(now):
+    """{recipe_id: вес} недавних действий с затуханием по времени."""
+    half_life = timedelta(days=TRENDING_HALF_LIFE_DAYS).total_seconds()
+    since = now - timedelta(days=TRENDING_WINDOW_DAYS)
+    scores = defaultdict(float)
+    for model, weight in ACTIVITY_WEIGHTS:
+        for recipe_id, created in (
+            model.objects.filter(created__gte=since)
+            .values_list('recipe_id', 'created')
+            .iterator(chunk_size=RANK_BATCH_SIZE)
+        ):
+            age = (now - created).total_seconds()
+            scores[recipe_id] += weight * 0.5 ** (age / half_life)
+    return scores
+
+
+def create_missing():
+    """Строки рейтинга с нулями для рецептов, у которых их нет."""
+    RecipeRank.objects.bulk_create(
+        (
+            RecipeRank(recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                rank__isnull=True
+            ).values_list('id', flat=True)
+        ),
+        batch_size=RANK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def rebuild(now=None):
+    """Пересчитывает рейтинги; возвращает число рецептов с активностью.
+
+    Строки не удаляются: у каждого рецепта строка остаётся, прежние
+    рейтинги обнуляются, а рецептам с активностью записываются новые.
+    """
+    now = now or timezone.now()
+    popular = popular_scores()
+    trending = trending_scores(now)
+    scored = popular.keys() | trending.keys()
+    with transaction.atomic():
+        create_missing()
+        RecipeRank.objects.filter(Q(popular__gt=0) | Q(trending__gt=0)).update(
+            popular=0, trending=0, updated=now
+        )
+        RecipeRank.objects.bulk_update(
+            [
+                RecipeRank(
+                    recipe_id=recipe_id,
+                    popular=popular.get(recipe_id, 0),
+                    trending=trending.get(recipe_id, 0),
+                    updated=now,
+                )
+                for recipe_id in scored
+            ],
+            ['popular', 'trending', 'updated'],
+            batch_size=RANK_BATCH_SIZE,
+        )
+        bump_version('ranks')
+    return len(scored)
+
+
+def ranked_recipes(queryset, ordering):
+    """id рецептов queryset по убыванию рейтинга, затем более новые.
+
+    Запрос идёт по таблице рейтингов: без условий это чтение начала
+    индекса, с условиями к нему добавляется отбор рецептов queryset.
+    """
+    ranks = RecipeRank.objects.order_by(f'-{ordering}', '-recipe_id')
+    if queryset.query.where:
+        ranks = ranks.filter(recipe__in=queryset.order_by().values('pk'))
+    return ranks.values_list('recipe_id', flat=True)
@@ -0,0 +1,118 @@
+"""Полнотекстовый поиск рецептов по названию и описанию.
+
+На PostgreSQL поиск идёт по колонке search_vector с GIN-индексом:
+её заполняет триггер базы (конфигурация russian, название весит
+больше описания). На SQLite - обратный индекс слов в памяти процесса
+с упрощённым отбрасыванием русских окончаний, пересобираемый в фоне
+после изменения рецептов: рецепты ранжируются в Python, а из базы
+загружается только страница.
+"""
+
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F
+
+from foodgram.constants import SEARCH_CONFIG, SEARCH_MIN_STEM
+
+from .cache import LocalIndex
+from .models import Recipe
+
+WORD = re.compile(r'\w+')
+ENDINGS = sorted(
+    (
+        'ами ями ого его ому ему ыми ими ая яя ое ее ые ие ый ий ой ом ем '
+        'ам ям ах ях ов ев ей ую юю а я о е ы и у ю ь й'
+    ).split(),
+    key=len,
+    reverse=True,
+)
+
+
+def stem(word):
+    """Слово без окончания, если от него остаётся основа."""
+    for ending in ENDINGS:
+        if word.endswith(ending) and (
+            len(word) - len(ending) >= SEARCH_MIN_STEM
+        ):
+            return word[: -len(ending)]
+    return word
+
+
+def tokenize(text):
+    return [
+        stem(word) for word in WORD.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+class RecipeIndex:
+    """Обратный индекс: основа слова -> {id рецепта: вес}."""
+
+    FIELD_WEIGHTS = (('name', 2), ('text', 1))
+
+    def __init__(self, rows):
+        self.postings = defaultdict(lambda: defaultdict(int))
+        for row in rows:
+            for field, weight in self.FIELD_WEIGHTS:
+                for term in tokenize(row[field]):
+                    self.postings[term][row['id']] += weight
+
+    @classmethod
+    def load(cls):
+        """Индекс по названиям и описаниям рецептов из базы."""
+        return cls(Recipe.objects.values('id', 'name', 'text').iterator())
+
+    def search(self, query):
+        """id рецептов со всеми словами запроса, лучшие первыми."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        matches = [self.postings.get(term, {}) for term in terms]
+        found = set.intersection(*(set(match) for match in matches))
+        scores = {pk: sum(match[pk] for match in matches) for pk in found}
+        return sorted(scores, key=lambda pk: (-scores[pk], -pk))
+
+
+recipe_index = LocalIndex('recipes', RecipeIndex.load)
+
+
+def search_in_database():
+    """Поиск идёт в базе (PostgreSQL), а не по индексу в памяти."""
+    return connection.vendor == 'postgresql'
+
+
+def search_recipes(queryset, query):
+    """Рецепты со словами запроса, по убыванию релевантности.
+
+    Только для поиска в базе: на SQLite см. search_recipe_ids.
+    """
+    search_query = SearchQuery(query, config=SEARCH_CONFIG)
+    return (
+        queryset.filter(search_vector=search_query)
+        .annotate(search_rank=SearchRank(F('search_vector'), search_query))
+        .order_by('-search_rank', '-pub_date', '-id')
+    )
+
+
+def search_recipe_ids(queryset, query, index):
+    """id рецептов queryset со словами запроса по индексу в памяти.
+
+    Отбор и ранжирование идут в Python, без IN и CASE по тысячам id
+    в SQL: из базы читаются только id рецептов queryset, если у него
+    есть условия или своя сортировка. С сортировкой порядок берётся
+    из queryset, иначе лучшие совпадения идут первыми.
+    """
+    found = index.search(query)
+    if not found:
+        return []
+    if queryset.query.order_by:
+        found = set(found)
+        return [
+            pk for pk in queryset.values_list('pk', flat=True) if pk in found
+        ]
+    if queryset.query.where:
+        allowed = set(queryset.order_by().values_list('pk', flat=True))
+        return [pk for pk in found if pk in allowed]
+    return found
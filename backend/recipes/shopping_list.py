@@ -0,0 +1,189 @@
+"""Поддержка сводных списков покупок в актуальном состоянии."""
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+
+from foodgram.constants import SHOPPING_LIST_BATCH_SIZE
+
+from .models import (
+    Recipe,
+    RecipeIngredient,
+    ShoppingListIngredient,
+    ShoppingСart,
+)
+
+
+def change_amounts(user_ids, deltas):
+    """Прибавляет к спискам пользователей изменения {ingredient_id: delta}.
+
+    Строки с нулевым и отрицательным количеством удаляются.
+    """
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items()
+        if delta
+    }
+    user_ids = list(user_ids)
+    if not deltas or not user_ids:
+        return
+    with transaction.atomic():
+        ShoppingListIngredient.objects.bulk_create(
+            (
+                ShoppingListIngredient(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=0
+                )
+                for user_id in user_ids
+                for ingredient_id, delta in deltas.items()
+                if delta > 0
+            ),
+            batch_size=SHOPPING_LIST_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        rows = ShoppingListIngredient.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=deltas
+        )
+        rows.update(
+            amount=F('amount')
+            + Case(
+                *(
+                    When(ingredient_id=ingredient_id, then=Value(delta))
+                    for ingredient_id, delta in deltas.items()
+                ),
+                default=Value(0),
+            )
+        )
+        rows.filter(amount__lte=0).delete()
+
+
+def get_recipe_amounts(recipe_id):
+    """Количество ингредиентов рецепта: {ingredient_id: amount}."""
+    return dict(
+        RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+            'ingredient_id', 'amount'
+        )
+    )
+
+
+def add_recipe(user_id, recipe_id):
+    """Рецепт добавлен в корзину."""
+    change_amounts((user_id,), get_recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id, recipe_id):
+    """Рецепт убран из корзины."""
+    change_amounts(
+        (user_id,),
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount in get_recipe_amounts(recipe_id).items()
+        },
+    )
+
+
+def recipe_ingredients_changed(recipe, old_amounts, new_amounts):
+    """Переносит изменение состава рецепта в списки покупок."""
+    deltas = {
+        ingredient_id: new_amounts.get(ingredient_id, 0)
+        - old_amounts.get(ingredient_id, 0)
+        for ingredient_id in old_amounts.keys() | new_amounts.keys()
+    }
+    change_amounts(
+        ShoppingСart.objects.filter(recipe=recipe).values_list(
+            'user_id', flat=True
+        ),
+        deltas,
+    )
+
+
+@contextmanager
+def tracking(recipe_ids):
+    """Переносит в списки покупок правки состава рецептов внутри блока.
+
+    Для правок в обход RecipeCreateSerializer (админка): состав рецептов
+    запоминается до блока и сравнивается с составом после него. Строки
+    рецептов блокируются до конца транзакции, как при правке через API.
+    """
+    recipe_ids = set(recipe_ids)
+    with transaction.atomic():
+        list(
+            Recipe.objects.select_for_update()
+            .filter(pk__in=recipe_ids)
+            .values_list('pk', flat=True)
+        )
+        old_amounts = {
+            recipe_id: get_recipe_amounts(recipe_id)
+            for recipe_id in recipe_ids
+        }
+        yield
+        for recipe_id, amounts in old_amounts.items():
+            recipe_ingredients_changed(
+                recipe_id, amounts, get_recipe_amounts(recipe_id)
+            )
+
+
+def expected_amounts(user_ids=None):
+    """Списки покупок, посчитанные заново по корзинам.
+
+    Возвращает {user_id: {ingredient_id: amount}}.
+    """
+    rows = ShoppingСart.objects.filter(recipe__recipes__isnull=False)
+    if user_ids is not None:
+        rows = rows.filter(user__in=user_ids)
+    amounts = defaultdict(dict)
+    for user_id, ingredient_id, amount in (
+        rows.values('user_id', 'recipe__recipes__ingredient_id')
+        .annotate(total=Sum('recipe__recipes__amount'))
+        .order_by()
+        .values_list('user_id', 'recipe__recipes__ingredient_id', 'total')
+        .iterator(chunk_size=SHOPPING_LIST_BATCH_SIZE)
+    ):
+        amounts[user_id][ingredient_id] = amount
+    return amounts
+
+
+def stored_amounts(user_ids=None):
+    """Списки покупок из таблицы: {user_id: {ingredient_id: amount}}."""
+    rows = ShoppingListIngredient.objects.all()
+    if user_ids is not None:
+        rows = rows.filter(user__in=user_ids)
+    amounts = defaultdict(dict)
+    for user_id, ingredient_id, amount in rows.values_list(
+        'user_id', 'ingredient_id', 'amount'
+    ).iterator(chunk_size=SHOPPING_LIST_BATCH_SIZE):
+        amounts[user_id][ingredient_id] = amount
+    return amounts
+
+
+def find_mismatches(user_ids=None):
+    """Пользователи, чей сохранённый список расходится с корзиной."""
+    expected = expected_amounts(user_ids)
+    stored = stored_amounts(user_ids)
+    return sorted(
+        user_id
+        for user_id in expected.keys() | stored.keys()
+        if expected.get(user_id, {}) != stored.get(user_id, {})
+    )
+
+
+def rebuild(user_ids=None):
+    """Пересобирает списки покупок; возвращает число строк."""
+    expected = expected_amounts(user_ids)
+    with transaction.atomic():
+        rows = ShoppingListIngredient.objects.all()
+        if user_ids is not None:
+            rows = rows.filter(user__in=user_ids)
+        rows.delete()
+        created = ShoppingListIngredient.objects.bulk_create(
+            (
+                ShoppingListIngredient(
+                    user_id=user_id, ingredient_id=ingredient_id, amount=amount
+                )
+                for user_id, amounts in expected.items()
+                for ingredient_id, amount in amounts.items()
+            ),
+            batch_size=SHOPPING_LIST_BATCH_SIZE,
+        )
+    return len(created)
@@ -0,0 +1,131 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from foodgram.tasks import run_in_background
+from users.models import User
+
+from . import shopping_list
+from .cache import bump_version, recipe_pages_changed
+from .counters import COUNTERS
+from .images import generate_thumbnails
+from .models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeRank,
+    ShoppingСart,
+    Tag,
+)
+
+
+@receiver(post_save, sender=ShoppingСart)
+def shopping_cart_added(sender, instance, created, **kwargs):
+    """Добавляет ингредиенты рецепта в сводный список покупок."""
+    if created:
+        shopping_list.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_delete, sender=ShoppingСart)
+def shopping_cart_removed(sender, instance, **kwargs):
+    """Убирает ингредиенты рецепта из сводного списка покупок.
+
+    pre_delete вызывается до каскадного удаления ингредиентов рецепта,
+    поэтому состав рецепта ещё доступен.
+    """
+    shopping_list.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredients_changed(sender, **kwargs):
+    """Сбрасывает закешированные список и поиск ингредиентов."""
+    bump_version('ingredients')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tags_changed(sender, **kwargs):
+    """Сбрасывает закешированный список тегов."""
+    bump_version('tags')
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, **kwargs):
+    """Ставит в очередь миниатюры для нового изображения рецепта."""
+    if instance.image and not instance.thumbnails_ready:
+        run_in_background(generate_thumbnails, instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    """Нулевой рейтинг нового рецепта: без строки рейтинга рецепт
+    не попал бы в ленту с сортировкой по рейтингу.
+    """
+    if created:
+        RecipeRank.objects.get_or_create(recipe=instance)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipes_changed(sender, **kwargs):
+    """Сбрасывает поисковый индекс и индекс ингредиентов рецептов."""
+    bump_version('recipes')
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def recipe_page_changed(sender, instance, **kwargs):
+    """Сбрасывает закешированные ответы с рецептом."""
+    recipe_pages_changed((instance.pk,))
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def recipe_ingredients_page_changed(sender, instance, **kwargs):
+    """Сбрасывает закешированные ответы с составом рецепта."""
+    recipe_pages_changed((instance.recipe_id,))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Сбрасывает закешированные ответы после смены тегов рецепта."""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        recipe_pages_changed((instance.pk,))
+    elif pk_set is None:
+        bump_version('tags')
+    else:
+        recipe_pages_changed(pk_set)
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, created, update_fields, **kwargs):
+    """Сбрасывает закешированные ответы, где показан автор.
+
+    Вход пользователя сохраняет только last_login и не сбрасывает кеш.
+    """
+    if created or (
+        update_fields is not None
+        and not set(update_fields)
+        & {
+            'email',
+            'username',
+            'first_name',
+            'last_name',
+        }
+    ):
+        return
+    bump_version('authors')
+
+
+for counter in COUNTERS:
+    post_save.connect(counter.added, sender=counter.related, weak=False)
+    post_delete.connect(counter.removed, sender=counter.related, weak=False)
@@ -0,0 +1,358 @@
+"""Синтетические данные для бенчмарков и нагрузочных тестов.
+
+Генерация детерминирована: одинаковые параметры и seed дают
+одинаковый набор данных. Популярность авторов, рецептов и ингредиентов
+распределена по степенному закону: вес объекта с рангом r равен
+1 / r ** skew, skew = 0 даёт равномерное распределение.
+
+Записи вставляются пачками: на PostgreSQL через COPY, на остальных
+базах через bulk_create. Сигналы при этом не срабатывают, поэтому
+сводные списки покупок, счётчики и рейтинги пересчитываются в конце.
+"""
+
+import csv
+import random
+from io import BytesIO, StringIO
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Max
+from PIL import Image
+
+from foodgram.constants import DIRICTORY_PATH, SEED_BATCH_SIZE
+from users.models import Subscribed, User
+
+from . import ranking, shopping_list
+from .cache import bump_version, recipe_pages_changed
+from .counters import COUNTERS
+from .models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingСart,
+    Tag,
+)
+
+TAGS = (
+    ('Завтрак', '#e26c2d', 'breakfast'),
+    ('Обед', '#49b64e', 'lunch'),
+    ('Ужин', '#8775d2', 'dinner'),
+    ('Десерт', '#f5a623', 'dessert'),
+    ('Выпечка', '#b8860b', 'baking'),
+    ('Суп', '#4a90e2', 'soup'),
+)
+WORDS = (
+    'суп салат пирог рагу запеканка каша омлет котлеты паста плов '
+    'домашний острый сливочный летний быстрый овощной грибной сырный'
+).split()
+PASSWORD = 'benchmark-password'
+
+
+class Dataset:
+    """Размеры набора данных: сколько чего создать.
+
+    Для связей задаётся среднее число на пользователя, конкретное
+    число у каждого пользователя выбирается от нуля до удвоенного.
+    """
+
+    def __init__(
+        self,
+        users=100,
+        recipes=1000,
+        ingredients_per_recipe=(3, 10),
+        favorites_per_user=10,
+        carts_per_user=3,
+        subscriptions_per_user=5,
+        images=8,
+        skew=1.0,
+    ):
+        self.users = users
+        self.recipes = recipes
+        self.ingredients_per_recipe = ingredients_per_recipe
+        self.favorites_per_user = favorites_per_user
+        self.carts_per_user = carts_per_user
+        self.subscriptions_per_user = subscriptions_per_user
+        self.images = images
+        self.skew = skew
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class Popularity:
+    """id в случайном порядке с накопленными весами 1 / r ** skew."""
+
+    def __init__(self, rng, ids, skew):
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.cum_weights = list(
+            accumulate(1 / rank**skew for rank in range(1, len(self.ids) + 1))
+        )
+
+    def choice(self, rng):
+        return rng.choices(self.ids, cum_weights=self.cum_weights)[0]
+
+    def sample(self, rng, count):
+        """count разных id, популярные выпадают чаще."""
+        if count >= len(self.ids):
+            return set(self.ids)
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(
+                rng.choices(
+                    self.ids,
+                    cum_weights=self.cum_weights,
+                    k=count - len(chosen),
+                )
+            )
+        return chosen
+
+
+def placeholder_image(rng, size=(640, 480)):
+    """PNG с цветными полосами, без обращения к сети."""
+    image = Image.new('RGB', size, tuple(rng.randrange(256) for _ in range(3)))
+    stripe = size[1] // 8
+    for top in range(0, size[1], stripe * 2):
+        image.paste(
+            tuple(rng.randrange(256) for _ in range(3)),
+            (0, top, size[0], top + stripe),
+        )
+    buffer = BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def save_placeholders(rng, count):
+    """Сохраняет заглушки изображений; возвращает их имена."""
+    return [
+        default_storage.save(
+            f'{DIRICTORY_PATH}synthetic_{index}.png',
+            ContentFile(placeholder_image(rng)),
+        )
+        for index in range(count)
+    ]
+
+
+def batches(objects, size):
+    """Разбивает поток объектов на списки длиной size."""
+    objects = iter(objects)
+    batch = list(islice(objects, size))
+    while batch:
+        yield batch
+        batch = list(islice(objects, size))
+
+
+def copy_rows(model, batch, fields, cursor):
+    """Вставляет пачку объектов командой COPY в формате CSV."""
+    buffer = StringIO()
+    csv.writer(buffer).writerows(
+        [
+            '\\N' if value is None else value
+            for value in (
+                field.get_prep_value(field.pre_save(obj, True))
+                for field in fields
+            )
+        ]
+        for obj in batch
+    )
+    buffer.seek(0)
+    columns = ', '.join(
+        connection.ops.quote_name(field.column) for field in fields
+    )
+    cursor.copy_expert(
+        f'COPY {connection.ops.quote_name(model._meta.db_table)} '
+        f"({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+        buffer,
+    )
+
+
+def insert(model, objects, batch_size=SEED_BATCH_SIZE):
+    """Вставляет объекты пачками, не держа в памяти весь поток."""
+    if connection.vendor != 'postgresql':
+        for batch in batches(objects, batch_size):
+            model.objects.bulk_create(batch)
+        return
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if field is not model._meta.auto_field
+    ]
+    with connection.cursor() as cursor:
+        for batch in batches(objects, batch_size):
+            copy_rows(model, batch, fields, cursor)
+
+
+def last_id(model):
+    """Наибольший id модели до вставки, 0 для пустой таблицы."""
+    return model.objects.aggregate(last=Max('id'))['last'] or 0
+
+
+def inserted_ids(model, after, **filters):
+    """id строк, вставленных после last_id: чужие строки не попадают."""
+    return list(
+        model.objects.filter(pk__gt=after, **filters)
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+
+def create_tags():
+    Tag.objects.bulk_create(
+        (Tag(name=name, color=color, slug=slug) for name, color, slug in TAGS),
+        ignore_conflicts=True,
+    )
+    return list(Tag.objects.values_list('id', flat=True))
+
+
+def create_users(rng, count, prefix, batch_size):
+    password = make_password(PASSWORD)
+    after = last_id(User)
+    insert(
+        User,
+        (
+            User(
+                username=f'{prefix}{index}',
+                email=f'{prefix}{index}@example.com',
+                first_name=rng.choice(('Анна', 'Иван', 'Мария', 'Пётр')),
+                last_name=rng.choice(('Иванова', 'Петров', 'Смирнова')),
+                password=password,
+            )
+            for index in range(count)
+        ),
+        batch_size,
+    )
+    return inserted_ids(User, after, username__startswith=prefix)
+
+
+def create_recipes(rng, count, authors, images, prefix, batch_size):
+    after = last_id(Recipe)
+    insert(
+        Recipe,
+        (
+            Recipe(
+                author_id=authors.choice(rng),
+                name=f'{prefix} {" ".join(rng.sample(WORDS, 2))} {index}',
+                text=' '.join(rng.choices(WORDS, k=rng.randint(10, 40))),
+                cooking_time=rng.randint(5, 180),
+                image=rng.choice(images),
+            )
+            for index in range(count)
+        ),
+        batch_size,
+    )
+    return inserted_ids(Recipe, after, author__username__startswith=prefix)
+
+
+def create_recipe_links(rng, recipe_ids, tag_ids, ingredients, sizes, size):
+    insert(
+        Recipe.tags.through,
+        (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in rng.sample(tag_ids, rng.randint(1, 2))
+        ),
+        size,
+    )
+    insert(
+        RecipeIngredient,
+        (
+            RecipeIngredient(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=rng.randint(1, 500),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in sorted(
+                ingredients.sample(rng, rng.randint(*sizes))
+            )
+        ),
+        size,
+    )
+
+
+def create_relations(rng, model, user_ids, targets, per_user, field, size):
+    insert(
+        model,
+        (
+            model(user_id=user_id, **{f'{field}_id': target_id})
+            for user_id in user_ids
+            for target_id in sorted(
+                targets.sample(rng, rng.randint(0, 2 * per_user))
+            )
+            if not (field == 'author' and target_id == user_id)
+        ),
+        size,
+    )
+
+
+def seed(
+    dataset, seed=0, prefix='bench', batch_size=SEED_BATCH_SIZE, progress=None
+):
+    """Создаёт набор данных; ингредиенты должны быть уже загружены.
+
+    Возвращает id созданных пользователей и рецептов. Префикс не должен
+    совпадать с началом имени ни одного существующего пользователя:
+    иначе настоящие аккаунты смешались бы с синтетическими.
+    """
+    progress = progress or (lambda message: None)
+    rng = random.Random(seed)
+    ingredient_ids = list(
+        Ingredient.objects.order_by('id').values_list('id', flat=True)
+    )
+    if not ingredient_ids:
+        raise ValueError('Сначала загрузите ингредиенты.')
+    if User.objects.filter(username__startswith=prefix).exists():
+        raise ValueError(
+            f'Уже есть пользователи, чьи имена начинаются с {prefix}; '
+            'выберите другой --prefix.'
+        )
+    images = save_placeholders(rng, dataset.images)
+    with transaction.atomic():
+        tag_ids = create_tags()
+        user_ids = create_users(rng, dataset.users, prefix, batch_size)
+        progress(f'Пользователи: {len(user_ids)}')
+        authors = Popularity(rng, user_ids, dataset.skew)
+        recipe_ids = create_recipes(
+            rng, dataset.recipes, authors, images, prefix, batch_size
+        )
+        progress(f'Рецепты: {len(recipe_ids)}')
+        create_recipe_links(
+            rng,
+            recipe_ids,
+            tag_ids,
+            Popularity(rng, ingredient_ids, dataset.skew),
+            dataset.ingredients_per_recipe,
+            batch_size,
+        )
+        progress('Теги и ингредиенты рецептов')
+        recipes = Popularity(rng, recipe_ids, dataset.skew)
+        for model, per_user in (
+            (Favorite, dataset.favorites_per_user),
+            (ShoppingСart, dataset.carts_per_user),
+        ):
+            create_relations(
+                rng, model, user_ids, recipes, per_user, 'recipe', batch_size
+            )
+        create_relations(
+            rng,
+            Subscribed,
+            user_ids,
+            authors,
+            dataset.subscriptions_per_user,
+            'author',
+            batch_size,
+        )
+        progress('Избранное, корзины и подписки')
+        shopping_list.rebuild(user_ids)
+        for counter in COUNTERS:
+            counter.reconcile()
+        ranking.rebuild()
+        progress('Списки покупок, счётчики и рейтинги')
+        bump_version('tags')
+        bump_version('recipes')
+        recipe_pages_changed()
+    return user_ids, recipe_ids
@@ -0,0 +1,90 @@
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+
+from api.tests.fixtures import create_catalog, create_recipes, create_user
+from recipes import shopping_list
+from recipes.models import Recipe, RecipeIngredient, ShoppingСart
+
+
+class AdminShoppingListTest(TestCase):
+    """Правки в админке доходят до сводных списков покупок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = create_user(0)
+        tags, cls.ingredients = create_catalog()
+        cls.recipes = create_recipes(
+            [create_user(1)], tags, cls.ingredients, 2
+        )
+        for recipe in cls.recipes:
+            ShoppingСart.objects.create(user=cls.buyer, recipe=recipe)
+
+    def setUp(self):
+        self.request = RequestFactory().post('/admin/')
+        self.request.user = self.buyer
+
+    def assertListsMatch(self):
+        self.assertEqual(shopping_list.find_mismatches(), [])
+
+    def test_edit_row(self):
+        admin = site._registry[RecipeIngredient]
+        row = RecipeIngredient.objects.filter(recipe=self.recipes[0]).first()
+        row.amount += 100
+        admin.save_model(self.request, row, None, change=True)
+        self.assertListsMatch()
+
+    def test_move_row_to_other_recipe(self):
+        admin = site._registry[RecipeIngredient]
+        taken = set(
+            RecipeIngredient.objects.filter(
+                recipe=self.recipes[1]
+            ).values_list('ingredient_id', flat=True)
+        )
+        row = RecipeIngredient.objects.filter(
+            recipe=self.recipes[0]
+        ).exclude(ingredient__in=taken).first()
+        row.recipe = self.recipes[1]
+        # Рецепт, куда переносится строка, есть только у другого покупателя.
+        ShoppingСart.objects.get(
+            user=self.buyer, recipe=self.recipes[1]
+        ).delete()
+        ShoppingСart.objects.create(
+            user=create_user(2), recipe=self.recipes[1]
+        )
+        admin.save_model(self.request, row, None, change=True)
+        self.assertListsMatch()
+
+    def test_delete_rows(self):
+        admin = site._registry[RecipeIngredient]
+        rows = RecipeIngredient.objects.filter(recipe=self.recipes[0])
+        admin.delete_model(self.request, rows.first())
+        self.assertListsMatch()
+        admin.delete_queryset(
+            self.request, RecipeIngredient.objects.all()
+        )
+        self.assertListsMatch()
+        self.assertEqual(shopping_list.stored_amounts(), {})
+
+    def test_inline(self):
+        admin = site._registry[Recipe]
+        recipe = self.recipes[0]
+
+        class Form:
+            instance = recipe
+
+            def save_m2m(self):
+                RecipeIngredient.objects.filter(recipe=recipe).update(
+                    amount=7
+                )
+
+        admin.save_related(self.request, Form(), [], change=True)
+        self.assertListsMatch()
+
+    def test_cart_moved(self):
+        admin = site._registry[ShoppingСart]
+        cart = ShoppingСart.objects.get(
+            user=self.buyer, recipe=self.recipes[0]
+        )
+        cart.user = create_user(2)
+        admin.save_model(self.request, cart, None, change=True)
+        self.assertListsMatch()
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from recipes.cache import LocalIndex
+
+
+class LocalIndexTest(SimpleTestCase):
+    """Индекс строится один раз на версию и обновляется в фоне."""
+
+    def setUp(self):
+        self.builds = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def build(self):
+        self.builds += 1
+        time.sleep(0.05)
+        self.release.wait()
+        return {'build': self.builds}
+
+    def get_from_threads(self, index, version):
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(index.get(version))
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_first_build_once(self):
+        index = LocalIndex('test', self.build)
+        results = self.get_from_threads(index, 1)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(results, [{'build': 1}] * 8)
+        self.assertIs(index.get(1), results[0])
+
+    def test_previous_index_while_rebuilding(self):
+        index = LocalIndex('test', self.build)
+        first = index.get(1)
+        self.release.clear()
+        results = self.get_from_threads(index, 2)
+        self.assertEqual(results, [first] * 8)
+        self.release.set()
+        index.rebuilding.join()
+        self.assertEqual(self.builds, 2)
+        self.assertEqual(index.get(2), {'build': 2})
+
+    def test_lookup_reports_previous_index(self):
+        index = LocalIndex('test', self.build)
+        self.assertEqual(index.lookup(1), ({'build': 1}, True))
+        self.release.clear()
+        self.assertEqual(index.lookup(2), ({'build': 1}, False))
+        self.release.set()
+        index.rebuilding.join()
+        self.assertEqual(index.lookup(2), ({'build': 2}, True))
+
+    def test_failed_rebuild_keeps_index(self):
+        index = LocalIndex('test', self.build)
+        first = index.get(1)
+        index.build = lambda: 1 / 0
+        with self.assertLogs('recipes.cache', 'ERROR'):
+            self.assertIs(index.get(2), first)
+            index.rebuilding.join()
+        self.assertEqual(index.current, (1, first))
+
+    @override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }
+        }
+    )
+    def test_without_cache(self):
+        index = LocalIndex('test', self.build)
+        self.assertIsNone(cache.get('version:test'))
+        self.assertEqual(index.get(), {'build': 1})
+        index.get()
+        index.rebuilding.join()
+        self.assertEqual(index.get(), {'build': 2})
@@ -0,0 +1,80 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api.tests.fixtures import create_user
+from foodgram.constants import THUMBNAIL_SIZES
+from recipes.images import generate_thumbnails
+from recipes.models import Recipe
+
+
+def image_file(name, size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/png')
+
+
+class ThumbnailsTest(TestCase):
+    """Миниатюры создаются после сохранения нового изображения."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.recipe = self.save(
+            Recipe(
+                author=create_user(0),
+                name='Рецепт',
+                text='Описание',
+                image=image_file('first.png'),
+            )
+        )
+
+    def save(self, recipe):
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+        recipe.refresh_from_db()
+        return recipe
+
+    def test_generated_on_save(self):
+        self.assertTrue(self.recipe.thumbnails_ready)
+        storage = self.recipe.image.storage
+        for variant, size in THUMBNAIL_SIZES.items():
+            name = self.recipe.thumbnails[variant]
+            self.assertTrue(storage.exists(name))
+            with storage.open(name) as thumbnail:
+                width, height = Image.open(thumbnail).size
+            self.assertLessEqual(width, size[0])
+            self.assertLessEqual(height, size[1])
+            self.assertEqual(
+                self.recipe.get_thumbnails()[variant], storage.url(name)
+            )
+
+    def test_image_replaced(self):
+        storage = self.recipe.image.storage
+        old = [self.recipe.thumbnails[variant] for variant in THUMBNAIL_SIZES]
+        self.recipe.image = image_file('second.png')
+        recipe = self.save(self.recipe)
+        self.assertTrue(recipe.thumbnails_ready)
+        self.assertEqual(recipe.thumbnails['source'], recipe.image.name)
+        for name in old:
+            self.assertFalse(storage.exists(name))
+
+    def test_unreadable_image(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(
+            image='recipe_img/missing.png', thumbnails={}
+        )
+        with self.assertLogs('recipes.images', 'WARNING'):
+            self.assertIsNone(generate_thumbnails(self.recipe.pk))
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        self.assertFalse(recipe.thumbnails_ready)
+        self.assertEqual(
+            recipe.get_thumbnails(),
+            {variant: recipe.image.url for variant in THUMBNAIL_SIZES},
+        )
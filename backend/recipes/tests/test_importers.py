@@ -0,0 +1,56 @@
+import io
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from recipes.importers import ImportFormatError, read_json
+
+ITEMS = [
+    {'name': f'ингредиент {number}', 'measurement_unit': 'г'}
+    for number in range(20)
+]
+ROWS = [(item['name'], item['measurement_unit']) for item in ITEMS]
+
+
+@mock.patch('recipes.importers.IMPORT_READ_SIZE', 7)
+class ReadJsonTest(SimpleTestCase):
+    """Разбор JSON по блокам: целый файл читается, битый - отвергается."""
+
+    def read(self, text):
+        return list(read_json(io.StringIO(text)))
+
+    def assertRejected(self, text):
+        with self.assertRaises(ImportFormatError):
+            self.read(text)
+
+    def test_items_across_blocks(self):
+        for text in (
+            json.dumps(ITEMS, ensure_ascii=False),
+            json.dumps(ITEMS, indent=2),
+        ):
+            self.assertEqual(self.read(text), ROWS)
+        self.assertEqual(self.read(' [ ] '), [])
+
+    def test_truncated(self):
+        text = json.dumps(ITEMS[:2], ensure_ascii=False)
+        self.assertRejected(text[: text.rindex('meas')])
+        self.assertRejected(text[:-1])
+        self.assertRejected(text[:-1] + ',')
+        self.assertRejected('')
+
+    def test_garbage_between_items(self):
+        text = json.dumps(ITEMS, ensure_ascii=False)
+        position = text.index('}, {') + 1
+        file = io.StringIO(text[:position] + ' мусор' + text[position:])
+        with self.assertRaises(ImportFormatError):
+            list(read_json(file))
+        self.assertLess(file.tell(), len(text) // 2)
+
+    @mock.patch('recipes.importers.IMPORT_MAX_ITEM_SIZE', 50)
+    def test_undecodable_item_stops_early(self):
+        text = '[{"name": "а", "measurement_unit": г}, ' + ' ' * 1000 + ']'
+        file = io.StringIO(text)
+        with self.assertRaises(ImportFormatError):
+            list(read_json(file))
+        self.assertLess(file.tell(), 100)
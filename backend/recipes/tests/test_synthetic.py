@@ -0,0 +1,81 @@
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingСart
+from recipes.synthetic import Dataset, seed
+from users.models import Subscribed, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class SeedTest(TestCase):
+    """Синтетические данные не затрагивают существующие записи."""
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(20)
+        )
+        cls.user = User.objects.create_user(
+            email='user1@example.com',
+            username='user1',
+            first_name='Имя',
+            last_name='Фамилия',
+            password='password-12345',
+        )
+        cls.recipe = Recipe.objects.create(
+            author=cls.user,
+            name='Настоящий рецепт',
+            text='Описание',
+            cooking_time=10,
+            image='recipes/images/recipe.png',
+        )
+
+    def seed(self, prefix):
+        return seed(
+            Dataset(users=10, recipes=30, images=1),
+            prefix=prefix,
+            batch_size=7,
+        )
+
+    def test_prefix_of_existing_user_refused(self):
+        with self.assertRaises(ValueError):
+            self.seed('user')
+        with self.assertRaises(ValueError):
+            self.seed('us')
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_only_inserted_rows(self):
+        user_ids, recipe_ids = self.seed('bench')
+        self.assertEqual(
+            set(user_ids),
+            set(
+                User.objects.filter(username__startswith='bench').values_list(
+                    'id', flat=True
+                )
+            ),
+        )
+        self.assertEqual(len(user_ids), 10)
+        self.assertEqual(len(recipe_ids), 30)
+        self.assertNotIn(self.user.pk, user_ids)
+        self.assertNotIn(self.recipe.pk, recipe_ids)
+        self.assertFalse(self.recipe.tags.exists())
+        self.assertFalse(self.recipe.ingredients.exists())
+        for model in (Favorite, ShoppingСart):
+            self.assertFalse(model.objects.filter(user=self.user).exists())
+            self.assertFalse(
+                model.objects.filter(recipe=self.recipe).exists()
+            )
+        self.assertFalse(
+            Subscribed.objects.filter(user=self.user).exists()
+            or Subscribed.objects.filter(author=self.user).exists()
+        )
@@ -5,7 +5,31 @@ from foodgram.constants import CHARACTER_LENGTH, EMAIL_ERROR, USERNAME_ERROR
 from users.validate import validate_username
 
 
-class User(AbstractUser):
+class CountersMixin:
+    """Защищает счётчики от перезаписи при save().
+
+    Счётчики меняются только через update() с F(), поэтому save()
+    уже загруженного объекта не пишет их устаревшие значения.
+    """
+
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class User(CountersMixin, AbstractUser):
     """Абстрактная модель пользователя."""
 
     username = models.CharField(
@@ -28,6 +52,12 @@ class User(AbstractUser):
     password = models.CharField('Пароль', max_length=CHARACTER_LENGTH)
     first_name = models.CharField('Имя', max_length=CHARACTER_LENGTH)
     last_name = models.CharField('Фамилия', max_length=CHARACTER_LENGTH)
+    recipes_count = models.PositiveIntegerField(
+        'Рецептов', default=0, editable=False
+    )
+    subscribers_count = models.PositiveIntegerField(
+        'Подписчиков', default=0, editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = [
@@ -35,6 +65,7 @@ class User(AbstractUser):
         'first_name',
         'last_name',
     ]
+    counter_fields = ('recipes_count', 'subscribers_count')
 
     class Meta:
         ordering = ('email',)
@@ -1,4 +1,141 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+import json
+from functools import partial, reduce
+from operator import or_
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import (
+    EmptyPage,
+    Page,
+    PageNotAnInteger,
+    Paginator,
+)
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+
+from foodgram.constants import COUNT_CACHE_TIMEOUT, COUNT_ESTIMATE_THRESHOLD
+from recipes.cache import get_versions
+
+
+def estimate_count(queryset):
+    """Оценка планировщика PostgreSQL для запроса без условий.
+
+    Возвращает None, если оценки нет или таблица слишком мала,
+    чтобы ей доверять.
+    """
+    query = queryset.query
+    connection = connections[queryset.db]
+    if (
+        connection.vendor != 'postgresql'
+        or query.where
+        or query.distinct
+        or query.group_by is not None
+    ):
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < COUNT_ESTIMATE_THRESHOLD:
+        return None
+    return row[0]
+
+
+def get_count(queryset, dependencies=None):
+    """Число записей запроса для ответа.
+
+    Для больших таблиц без фильтров берётся оценка планировщика.
+    Если переданы имена версий данных (dependencies), COUNT(*) кешируется
+    на COUNT_CACHE_TIMEOUT под ключом из текста SQL, параметров и этих
+    версий, поэтому запись в данные сразу даёт новый ключ. Без них
+    записи считаются каждый раз.
+    """
+    if not isinstance(queryset, QuerySet):
+        return len(queryset)
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    count = estimate_count(queryset)
+    if count is not None:
+        return count
+    if dependencies is None:
+        return queryset.count()
+    versions = sorted(get_versions(dependencies).items())
+    key = (
+        'count:'
+        + hashlib.sha1(f'{sql}:{params!r}:{versions!r}'.encode()).hexdigest()
+    )
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class LookaheadPage(Page):
+    """Страница, знающая о следующей по лишней прочитанной записи."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self.more = has_next
+
+    def has_next(self):
+        return self.more
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, которому для выдачи страницы не нужен COUNT(*).
+
+    Страница читается с одной лишней записью: по ней видно, есть ли
+    следующая, а пустая страница после первой - ошибка. Число записей
+    из get_count (кеш или оценка) только показывается в ответе и не
+    влияет ни на выборку, ни на проверку номера страницы.
+    """
+
+    def __init__(self, object_list, per_page, dependencies=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.dependencies = dependencies
+
+    @cached_property
+    def count(self):
+        return get_count(self.object_list, self.dependencies)
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page + 1
+        object_list = list(self.object_list[bottom:top])
+        if not object_list and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return LookaheadPage(
+            object_list[: self.per_page],
+            number,
+            self,
+            len(object_list) > self.per_page,
+        )
 
 
 class LimitPageNumberPagination(PageNumberPagination):
@@ -11,9 +148,155 @@ class LimitPageNumberPagination(PageNumberPagination):
     page_size (int): Количество элементов на странице по умолчанию.
     page_size_query_param (str): Название параметра запроса,
     который позволяет пользователю указать количество элементов на странице.
+    django_paginator_class: Paginator без COUNT(*) для выдачи страницы;
+    число записей кешируется по версиям из get_count_dependencies вьюсета.
     :param PageNumberPagination: Базовый класс для
     пагинации на основе номера страницы.
     """
 
     page_size = 6
     page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        get_dependencies = getattr(view, 'get_count_dependencies', None)
+        self.django_paginator_class = partial(
+            CachedCountPaginator,
+            dependencies=get_dependencies() if get_dependencies else None,
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по составному ключу сортировки.
+
+    Ключ берётся из атрибута keyset_ordering вьюсета, например
+    ('-pub_date', '-id'); все поля сортируются в одну сторону.
+    Курсор хранит значения ключа последней (или первой) записи страницы,
+    следующая страница выбирается условием по ключу без OFFSET и COUNT.
+    """
+
+    page_size = LimitPageNumberPagination.page_size
+    page_size_query_param = 'limit'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(view.keyset_ordering)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip('-'))
+            for name in self.ordering
+        ]
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.reverse)
+        if cursor is not None:
+            queryset = queryset.filter(
+                self.get_keyset_filter(self.decode_position(cursor), reverse)
+            )
+        ordering = self.ordering
+        if reverse:
+            ordering = [self.reverse_order(name) for name in ordering]
+        page = list(queryset.order_by(*ordering)[: page_size + 1])
+        has_more = len(page) > page_size
+        self.page = page[:page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.display_page_controls = self.has_next or self.has_previous
+        return self.page
+
+    @staticmethod
+    def reverse_order(name):
+        return name[1:] if name.startswith('-') else f'-{name}'
+
+    def decode_position(self, cursor):
+        """Значения ключа из курсора, приведённые к типам полей."""
+        try:
+            values = json.loads(cursor.position)
+            if len(values) != len(self.fields):
+                raise ValueError
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_keyset_filter(self, values, reverse):
+        """Условие «после ключа» для (a, b): a < x OR (a = x AND b < y)."""
+        descending = self.ordering[0].startswith('-')
+        lookup = 'lt' if descending != reverse else 'gt'
+        names = [field.name for field in self.fields]
+        return reduce(
+            or_,
+            (
+                Q(
+                    **dict(zip(names[:index], values[:index])),
+                    **{f'{names[index]}__{lookup}': values[index]},
+                )
+                for index in range(len(names))
+            ),
+        )
+
+    def get_position(self, instance):
+        return json.dumps(
+            [field.value_to_string(instance) for field in self.fields]
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=False,
+                position=self.get_position(self.page[-1]),
+            )
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=True,
+                position=self.get_position(self.page[0]),
+            )
+        )
+
+
+class OptionalKeysetPagination(LimitPageNumberPagination):
+    """
+    Пагинация limit/page по умолчанию и курсорная по запросу.
+
+    Курсорный режим включается параметром ?pagination=cursor
+    (или переданным cursor) во вьюсетах с атрибутом keyset_ordering.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if getattr(view, 'keyset_ordering', None) and (
+            request.query_params.get('pagination') == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        ):
+            self.keyset = self.keyset_pagination_class()
+            page = self.keyset.paginate_queryset(queryset, request, view)
+            self.display_page_controls = self.keyset.display_page_controls
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.keyset is not None:
+            return self.keyset.to_html()
+        return super().to_html()
@@ -1,6 +1,8 @@
 from djoser.serializers import UserCreateSerializer
 from rest_framework import serializers
 
+from api.v1.relations import ViewerRelations, ViewerRelationsListSerializer
+
 from .models import User
 
 
@@ -34,11 +36,15 @@ class UserSerializer(serializers.ModelSerializer):
             'last_name',
             'is_subscribed',
         )
+        list_serializer_class = ViewerRelationsListSerializer
+
+    @staticmethod
+    def prime_relations(relations, users):
+        """Загрузка подписок для страницы пользователей."""
+        relations.prime(author_ids=[user.id for user in users])
 
     def get_is_subscribed(self, obj):
         """Метод получения подписки"""
-        user = self.context.get('request').user
-        return bool(
-            user.is_authenticated
-            and obj.subscribing.filter(user=user).exists()
-        )
+        return ViewerRelations.for_request(
+            self.context.get('request')
+        ).is_subscribed(obj.id)
@@ -1,3 +1,4 @@
+from django.db.models import OuterRef, Prefetch, Subquery
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet
 from rest_framework import response, status
@@ -6,7 +7,8 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 
 from api.v1.serializers import AddSubscribedSerializer, SubscribedSerializer
 from foodgram.constants import SUBCRIDE_DELETE
-from users.pagination import LimitPageNumberPagination
+from recipes.models import Recipe
+from users.pagination import OptionalKeysetPagination
 
 from .models import Subscribed, User
 from .serializers import UserSerializer
@@ -18,7 +20,8 @@ class UsersViewSet(UserViewSet):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = UserSerializer
-    pagination_class = LimitPageNumberPagination
+    pagination_class = OptionalKeysetPagination
+    keyset_ordering = ('email', 'id')
 
     @staticmethod
     def adding_author(add_serializer, model, request, author_id):
@@ -33,6 +36,32 @@ class UsersViewSet(UserViewSet):
             status=status.HTTP_201_CREATED,
         )
 
+    @staticmethod
+    def get_subscriptions(request):
+        """Авторы, на которых подписан пользователь.
+
+        Число рецептов берётся из счётчика автора, а сами рецепты
+        подгружаются одним запросом: коррелированный подзапрос с LIMIT
+        оставляет не больше recipes_limit последних рецептов автора.
+        """
+        recipes_limit = SubscribedSerializer.get_recipes_limit(request)
+        authors = User.objects.filter(subscribing__user=request.user)
+        if not recipes_limit:
+            return authors
+        return authors.prefetch_related(
+            Prefetch(
+                'recipes',
+                queryset=Recipe.objects.filter(
+                    pk__in=Subquery(
+                        Recipe.objects.filter(
+                            author=OuterRef('author')
+                        ).values('pk')[:recipes_limit]
+                    )
+                ),
+                to_attr='limited_recipes',
+            )
+        )
+
     @action(
         detail=False, methods=['get'], permission_classes=(IsAuthenticated,)
     )
@@ -42,9 +71,7 @@ class UsersViewSet(UserViewSet):
         """
         return self.get_paginated_response(
             SubscribedSerializer(
-                self.paginate_queryset(
-                    User.objects.filter(subscribing__user=request.user)
-                ),
+                self.paginate_queryset(self.get_subscriptions(request)),
                 many=True,
                 context={'request': request},
             ).data